@@ -2,126 +2,176 @@ import logging
 import sqlite3
 import json
 import os
-from datetime import datetime, timedelta
+import re
+import atexit
+import threading
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+# 환경 변수 파일의 KEY=VALUE 라인 (주석/빈 줄 제외)
+_ENV_RE = re.compile(r'(?m)^([^#=\s][^=\n]*)=(.*)$')
 
 # 환경 변수 로딩
 def load_env():
     """환경 변수 파일 로딩"""
-    env_file = "default.env"
-    if os.path.exists(env_file):
+    env_file = Path("default.env")
+    if env_file.exists():
         try:
-            with open(env_file, "r", encoding="utf-8") as f:
-                for line in f:
-                    line = line.strip()
-                    if line and not line.startswith("#") and "=" in line:
-                        key, value = line.split("=", 1)
-                        os.environ[key] = value
-            print(f"환경 변수 로딩 완료: {env_file}")
+            data = env_file.read_text(encoding="utf-8")
+            pairs = {key.strip(): value.strip() for key, value in _ENV_RE.findall(data)}
+            # 이미 설정된 환경 변수는 유지하고 새 키만 반영
+            os.environ.update({key: value for key, value in pairs.items() if key not in os.environ})
+            log.info(f"환경 변수 로딩 완료: {env_file}")
         except Exception as e:
-            print(f"환경 변수 로딩 오류: {e}")
+            log.error(f"환경 변수 로딩 오류: {e}")
     else:
-        print(f"환경 변수 파일 없음: {env_file}")
+        log.info(f"환경 변수 파일 없음: {env_file}")
+
+def _tune_connection(conn):
+    """SQLite 성능 PRAGMA 적용 (읽기 전용 연결 기준)
+
+    journal_mode=WAL은 DB 파일에 기록되는 설정이라 쓰기 연결(앱)에서만 바꿀 수 있으므로
+    여기서는 읽기 성능에 영향을 주는 PRAGMA만 적용합니다.
+    """
+    conn.executescript("""
+        PRAGMA synchronous=NORMAL;
+        PRAGMA busy_timeout=5000;
+        PRAGMA cache_size=-20000;      -- 20MB
+        PRAGMA temp_store=MEMORY;
+        PRAGMA mmap_size=268435456;    -- 256MB
+    """)
+    return conn
+
+# db_path별로 재사용하는 SQLite 연결 캐시
+_conn_cache = {}
+_conn_lock = threading.Lock()
+
+def _get_conn(db_path):
+    """db_path에 대한 캐시된 읽기 전용 연결 반환 (없으면 생성)"""
+    with _conn_lock:
+        conn = _conn_cache.get(db_path)
+        if conn is None:
+            # 진단용 조회만 하므로 읽기 전용으로 연결 (쓰기 잠금 생략)
+            conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, check_same_thread=False)
+            _tune_connection(conn)
+            conn.row_factory = sqlite3.Row
+            _conn_cache[db_path] = conn
+        return conn
+
+def _close_all_conns():
+    """캐시된 SQLite 연결 모두 닫기"""
+    with _conn_lock:
+        for conn in _conn_cache.values():
+            try:
+                conn.close()
+            except Exception:
+                pass
+        _conn_cache.clear()
+
+atexit.register(_close_all_conns)
+
+# 최근 주문 조회 쿼리 (SQL 문자열을 고정해 sqlite3 문장 캐시에서 재사용되도록 파라미터 바인딩)
+# created_at을 함수로 감싸지 않아야 idx_order_created_at 인덱스를 사용할 수 있음
+_RECENT_ORDERS_SQL = """
+SELECT o.order_id, o.company_id, o.is_printed, o.created_at
+FROM [order] o
+WHERE o.created_at > ?
+ORDER BY o.created_at DESC
+LIMIT ?
+"""
+
+# 최근 주문 수/미출력 주문 수 집계 쿼리
+_RECENT_ORDER_COUNTS_SQL = """
+SELECT COUNT(*), COALESCE(SUM(CASE WHEN o.is_printed = 0 THEN 1 ELSE 0 END), 0)
+FROM [order] o
+WHERE o.created_at > ?
+"""
 
 # 로깅 설정
 logging.basicConfig(
     level=logging.DEBUG,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
+log = logging.getLogger("debug_auto_print")
 
 def check_auto_print_status():
     """자동출력 상태 진단"""
-    print("=== 자동출력 진단 시작 ===")
+    log.info("=== 자동출력 진단 시작 ===")
     
     # 환경 변수 로딩
     load_env()
     
     # 1. 프린터 설정 확인
-    print("\n1. 프린터 설정 확인:")
+    log.info("1. 프린터 설정 확인:")
     try:
         from src.printer.manager import PrinterManager
         printer_manager = PrinterManager()
         auto_print_enabled = printer_manager.is_auto_print_enabled()
         auto_config = printer_manager.get_auto_print_config()
         
-        print(f"  자동출력 활성화: {auto_print_enabled}")
-        print(f"  자동출력 설정: {auto_config}")
+        log.info(f"  자동출력 활성화: {auto_print_enabled}")
+        log.info(f"  자동출력 설정: {auto_config}")
         
         # 프린터 상태 확인
         printer_status = printer_manager.check_printer_status()
-        print(f"  프린터 상태: {printer_status}")
+        log.info(f"  프린터 상태: {printer_status}")
         
     except Exception as e:
-        print(f"  프린터 설정 확인 오류: {e}")
-        import traceback
-        print(f"  상세 오류: {traceback.format_exc()}")
+        log.exception(f"  프린터 설정 확인 오류: {e}")
     
     # 2. 데이터베이스 상태 확인
-    print("\n2. 데이터베이스 상태 확인:")
+    log.info("2. 데이터베이스 상태 확인:")
     unprinted_count = 0
     try:
         db_path = 'orders.db'
         if not os.path.exists(db_path):
-            print(f"  데이터베이스 파일 없음: {db_path}")
+            log.info(f"  데이터베이스 파일 없음: {db_path}")
             return
             
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row
+        conn = _get_conn(db_path)
         cursor = conn.cursor()
         
         # 테이블 존재 확인
         tables_query = "SELECT name FROM sqlite_master WHERE type='table'"
-        tables = [row[0] for row in cursor.execute(tables_query).fetchall()]
-        print(f"  존재하는 테이블: {tables}")
+        tables = [row[0] for row in cursor.execute(tables_query)]
+        log.info(f"  존재하는 테이블: {tables}")
         
         if 'order' not in tables:
-            print("  'order' 테이블이 존재하지 않습니다.")
-            conn.close()
+            log.info("  'order' 테이블이 존재하지 않습니다.")
             return
         
-        # 최근 주문 조회
-        query = """
-        SELECT o.order_id, o.company_id, o.is_printed, o.created_at
-        FROM [order] o
-        WHERE datetime(o.created_at) > datetime('now', '-2 hours')
-        ORDER BY o.created_at DESC
-        LIMIT 10
-        """
-        
-        rows = cursor.execute(query).fetchall()
-        print(f"  최근 2시간 주문: {len(rows)}개")
-        
-        for row in rows:
-            is_printed = bool(row['is_printed'])
-            if not is_printed:
-                unprinted_count += 1
-            
-            print(f"    주문ID: {row['order_id']}, "
-                  f"출력여부: {'출력됨' if is_printed else '미출력'}, "
-                  f"생성시간: {row['created_at']}")
+        # 최근 주문 조회 (Supabase의 created_at은 UTC ISO 8601 문자열이므로 같은 형식으로 비교)
+        cutoff = (datetime.now(timezone.utc) - timedelta(hours=2)).strftime('%Y-%m-%dT%H:%M:%S')
+        total_count, unprinted_count = cursor.execute(_RECENT_ORDER_COUNTS_SQL, (cutoff,)).fetchone()
+        log.info(f"  최근 2시간 주문: {total_count}개")
         
-        print(f"  미출력 주문: {unprinted_count}개")
+        # 최근 10개만 미리보기
+        lines = [
+            f"    주문ID: {row['order_id']}, "
+            f"출력여부: {'출력됨' if row['is_printed'] else '미출력'}, "
+            f"생성시간: {row['created_at']}"
+            for row in cursor.execute(_RECENT_ORDERS_SQL, (cutoff, 10))
+        ]
+        if lines:
+            log.info("  최근 주문 미리보기:\n" + "\n".join(lines))
         
-        conn.close()
+        log.info(f"  미출력 주문: {unprinted_count}개")
         
     except Exception as e:
-        print(f"  데이터베이스 확인 오류: {e}")
-        import traceback
-        print(f"  상세 오류: {traceback.format_exc()}")
+        log.exception(f"  데이터베이스 확인 오류: {e}")
     
     # 3. 자동출력 시뮬레이션
-    print("\n3. 자동출력 시뮬레이션:")
+    log.info("3. 자동출력 시뮬레이션:")
     if unprinted_count > 0:
-        print("  미출력 주문이 있으므로 자동출력이 시도되어야 합니다.")
-        print("  실제 자동출력을 테스트하려면 main.py를 실행하고 로그를 확인하세요.")
+        log.info("  미출력 주문이 있으므로 자동출력이 시도되어야 합니다.")
+        log.info("  실제 자동출력을 테스트하려면 main.py를 실행하고 로그를 확인하세요.")
     else:
-        print("  현재 미출력 주문이 없습니다.")
+        log.info("  현재 미출력 주문이 없습니다.")
     
-    print("\n=== 진단 완료 ===")
+    log.info("=== 진단 완료 ===")
 
 if __name__ == "__main__":
     try:
         check_auto_print_status()
     except Exception as e:
-        print(f"진단 중 오류 발생: {e}")
-        import traceback
-        print(f"상세 오류: {traceback.format_exc()}") 
\ No newline at end of file
+        log.exception(f"진단 중 오류 발생: {e}") 
\ No newline at end of file
@@ -1,70 +1,129 @@
 import sys
 import os
 import logging
+import logging.handlers
 import traceback
-from zoneinfo import ZoneInfo
 import time
 from pathlib import Path
 import threading
 import signal
 import atexit
 import json
+import functools
 from datetime import datetime, timedelta
 
 from dotenv import load_dotenv
-from PySide6.QtWidgets import QApplication, QMessageBox
-from src.gui.main_window import MainWindow
-from src.updater import check_and_update
+import requests
+from requests.adapters import HTTPAdapter
+from src.updater import check_and_update, get_last_release_etag
 from src.error_logger import initialize_error_logger, get_error_logger, shutdown_error_logger
 from src.utils import resource_path, get_app_root
 
-def setup_logging():
+# 한국 표준시(KST) UTC 오프셋 (서머타임 없음)
+_KST_OFFSET_SECONDS = 9 * 3600
+
+# 버퍼링된 파일 로그 핸들러 (종료 시 flush)
+_buffered_file_handler = None
+
+# 버퍼링된 파일 로그를 주기적으로 기록하는 간격 (초)
+_LOG_FLUSH_INTERVAL_SECONDS = 2
+
+# 마지막 업데이트 확인 시간/릴리즈 ETag 캐시 (save_last_update_check에서 갱신)
+_last_update_check = None
+_last_update_etag = None
+
+# 업데이트 확인용 HTTP 세션 (GitHub 연결 재사용)
+_HTTP_SESSION = requests.Session()
+_HTTP_SESSION.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=2))
+
+def setup_logging(log_path):
+    global _buffered_file_handler
+
     # 로깅 설정 (쓰기 가능한 경로 사용)
-    log_filename = os.getenv("APP_LOG_PATH", "app.log")
-    log_path = get_app_root() / log_filename
     os.environ["TZ"] = "Asia/Seoul"
     try:
         time.tzset()
+        converter = time.localtime
     except AttributeError:
-        pass
+        # tzset이 없는 Windows에서는 고정 오프셋으로 KST 계산
+        converter = lambda ts: time.gmtime(ts + _KST_OFFSET_SECONDS)
 
     formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-    formatter.converter = lambda ts: datetime.fromtimestamp(ts, ZoneInfo("Asia/Seoul")).timetuple()
+    formatter.converter = converter
+
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(formatter)
 
-    handlers = [
-        logging.StreamHandler(),
-        logging.FileHandler(log_path, encoding='utf-8')
-    ]
-    for h in handlers:
-        h.setFormatter(formatter)
+    # 파일 로그는 메모리에 조금씩 모았다가 기록 (WARNING 이상은 즉시, 나머지는 최대 2초 지연)
+    # 강제 종료/정전 시 잃는 로그가 적도록 버퍼를 작게 유지
+    file_handler = logging.FileHandler(log_path, encoding='utf-8')
+    file_handler.setFormatter(formatter)
+    _buffered_file_handler = logging.handlers.MemoryHandler(
+        capacity=32,
+        flushLevel=logging.WARNING,
+        target=file_handler
+    )
+    atexit.register(_buffered_file_handler.flush)
+    threading.Thread(target=_flush_log_periodically, name="log-flush", daemon=True).start()
+
+    handlers = [stream_handler, _buffered_file_handler]
 
     logging.basicConfig(level=logging.DEBUG, handlers=handlers)
 
+def _flush_log_periodically():
+    """버퍼링된 파일 로그를 일정 간격으로 기록 (app.log가 실시간 상황보다 늦지 않도록)"""
+    while True:
+        time.sleep(_LOG_FLUSH_INTERVAL_SECONDS)
+        if _buffered_file_handler:
+            _buffered_file_handler.flush()
+
 def get_last_update_check():
     """마지막 업데이트 확인 시간을 가져옵니다."""
+    global _last_update_check, _last_update_etag
+    if _last_update_check is not None:
+        return _last_update_check
+
     try:
         update_check_file = get_app_root() / "last_update_check.json"
         if update_check_file.exists():
             with open(update_check_file, 'r', encoding='utf-8') as f:
                 data = json.load(f)
-                return datetime.fromisoformat(data.get('last_check', '2000-01-01T00:00:00'))
-        return datetime(2000, 1, 1)  # 기본값: 오래 전 날짜
+                _last_update_check = datetime.fromisoformat(data.get('last_check', '2000-01-01T00:00:00'))
+                _last_update_etag = data.get('etag')
+        else:
+            _last_update_check = datetime(2000, 1, 1)  # 기본값: 오래 전 날짜
     except Exception:
-        return datetime(2000, 1, 1)
+        _last_update_check = datetime(2000, 1, 1)
+    return _last_update_check
+
+def get_last_update_etag():
+    """마지막 업데이트 확인 시 받은 릴리즈 ETag를 가져옵니다."""
+    get_last_update_check()
+    return _last_update_etag
 
-def save_last_update_check():
+def save_last_update_check(etag=None):
     """마지막 업데이트 확인 시간을 저장합니다."""
+    global _last_update_check, _last_update_etag
+    now = datetime.now()
+    _last_update_check = now
+    if etag:
+        _last_update_etag = etag
     try:
         update_check_file = get_app_root() / "last_update_check.json"
         data = {
-            'last_check': datetime.now().isoformat(),
+            'last_check': now.isoformat(),
             'app_version': get_current_version()
         }
-        with open(update_check_file, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        if _last_update_etag:
+            data['etag'] = _last_update_etag
+        # 임시 파일에 쓴 뒤 교체 (쓰기 도중 종료되어도 기존 파일이 손상되지 않음)
+        tmp_file = update_check_file.with_suffix('.json.tmp')
+        tmp_file.write_text(json.dumps(data, ensure_ascii=False, separators=(',', ':')), encoding='utf-8')
+        os.replace(tmp_file, update_check_file)
     except Exception as e:
         logging.warning(f"업데이트 확인 시간 저장 실패: {e}")
 
+@functools.lru_cache(maxsize=1)
 def get_current_version():
     """현재 앱 버전을 가져옵니다."""
     try:
@@ -119,27 +178,27 @@ def normalize_github_repo(repo_string):
 def check_for_updates_async():
     """백그라운드에서 업데이트 확인 (최초 실행 시 또는 24시간마다)"""
     try:
-        # 업데이트 확인 필요성 체크
-        if not should_check_for_updates():
-            return
-
         # 기본 GitHub 저장소 설정
         default_github_repo = "your-username/posprinter_supabase"
         env_repo = os.getenv('GITHUB_REPO', default_github_repo)
         github_repo = normalize_github_repo(env_repo)
 
-        logging.info("업데이트 확인을 시작합니다...")
-        
-        if github_repo and github_repo != "your-username/posprinter_supabase":
+        if github_repo and github_repo != default_github_repo:
+            # 업데이트 확인 필요성 체크 (저장소가 설정된 경우에만 확인 기록 파일 조회)
+            if not should_check_for_updates():
+                return
+
+            logging.info("업데이트 확인을 시작합니다...")
             try:
-                if check_and_update(github_repo, auto_apply=False):
+                if check_and_update(github_repo, auto_apply=False,
+                                    session=_HTTP_SESSION, etag=get_last_update_etag()):
                     logging.info("🎉 새로운 업데이트가 확인되었습니다!")
                     # TODO: 사용자에게 업데이트 알림 표시
                 else:
                     logging.info("✅ 최신 버전을 사용 중입니다.")
                 
                 # 업데이트 확인 완료 시간 저장
-                save_last_update_check()
+                save_last_update_check(get_last_release_etag())
                 
             except Exception as e:
                 logging.warning(f"업데이트 확인 중 오류 발생: {e}")
@@ -157,6 +216,8 @@ def cleanup_on_exit():
     logging.info("프로그램 종료 중 - 정리 작업 수행 중...")
     shutdown_error_logger()
     logging.info("정리 작업 완료")
+    if _buffered_file_handler:
+        _buffered_file_handler.flush()
 
 def signal_handler(signum, frame):
     """시그널 핸들러"""
@@ -167,7 +228,8 @@ def signal_handler(signum, frame):
 def main():
     try:
         # .env 파일 로드 (쓰기 가능한 애플리케이션 루트에서 .env 파일을 찾음)
-        dotenv_path = get_app_root() / "default.env"
+        app_root = get_app_root()
+        dotenv_path = app_root / "default.env"
         if dotenv_path.exists():
             load_dotenv(dotenv_path=dotenv_path)
         else:
@@ -175,7 +237,8 @@ def main():
             logging.basicConfig(level=logging.INFO)
             logging.warning(f".env 파일을 찾을 수 없습니다: {dotenv_path}")
 
-        setup_logging()
+        log_path = app_root / os.getenv("APP_LOG_PATH", "app.log")
+        setup_logging(log_path)
         
         # 종료 시 정리 작업 등록
         atexit.register(cleanup_on_exit)
@@ -197,14 +260,14 @@ def main():
         
         # 데이터베이스 설정을 중앙에서 관리 (쓰기 가능한 경로 사용)
         db_path_str = os.getenv("CACHE_DB_PATH", "cache.db")
-        db_path = get_app_root() / db_path_str
+        db_path = app_root / db_path_str
         db_config = {
             'path': str(db_path.resolve())
         }
         
         logging.info(f"Supabase URL: {supabase_config['url']}")
         logging.info(f"데이터베이스 파일 위치: {db_config['path']}")
-        logging.info(f"로그 파일 위치: {get_app_root() / os.getenv('APP_LOG_PATH', 'app.log')}")
+        logging.info(f"로그 파일 위치: {log_path}")
         logging.info(f"현재 앱 버전: {get_current_version()}")
         
         # Supabase 에러 로깅 시스템 초기화
@@ -232,6 +295,10 @@ def main():
         except Exception as e:
             logging.error(f"에러 로깅 시스템 초기화 실패: {e}")
         
+        # Qt/GUI 모듈은 실제로 GUI를 띄울 때만 로드
+        from PySide6.QtWidgets import QApplication
+        from src.gui.main_window import MainWindow
+        
         app = QApplication(sys.argv)
         
         try:
@@ -1,8 +1,12 @@
 import os
+import functools
+import hashlib
 import sqlite3
-from contextlib import suppress
+import threading
+from contextlib import contextmanager, suppress
+from itertools import groupby
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 import requests
 import logging
 from src.error_logger import get_error_logger
@@ -11,6 +15,21 @@ SCHEMA_PATH = Path(__file__).parent / "sqlite_schema.sql"
 DB_PATH = Path(os.getenv("CACHE_DB_PATH", "cache.db"))
 
 logger = logging.getLogger(__name__)
+
+# 증분 동기화에 쓰는 테이블별 증가 키 (이 값보다 큰 행만 새로 받음)
+INCREMENTAL_KEYS = {
+    "order": "order_id",
+    "order_item": "order_item_id",
+    "order_item_option": "order_item_option_id",
+}
+
+# 연결마다 적용하는 SQLite 설정 (journal_mode=WAL은 파일에 유지되므로 setup_sqlite에서 한 번만 설정)
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-20000",
+    "PRAGMA mmap_size=268435456",
+)
 # Supabase 테이블 이름을 명시적으로 나열하여 허용 리스트를 구성합니다.
 VALID_TABLES = {
     "company",
@@ -25,23 +44,133 @@ VALID_TABLES = {
     "order_item_option",
 }
 
+_RECENT_ORDERS_SQL = """
+SELECT o.order_id, o.company_id, o.is_dine_in, o.total_price, o.created_at, o.signature_data,
+       o.is_printed, o.print_status, o.print_attempts, o.last_print_attempt,
+       c.company_name, c.required_signature
+FROM "order" o
+JOIN company c ON c.company_id = o.company_id
+ORDER BY o.created_at DESC
+LIMIT ?
+"""
+
+
+# 주문 상세 조인 (WHERE/ORDER BY는 용도별로 덧붙임)
+_ORDER_DETAILS_SELECT = """
+SELECT o.order_id, o.is_dine_in, o.total_price, o.created_at, o.signature_data,
+       o.print_status, o.print_attempts, o.last_print_attempt, o.is_printed,
+       c.company_name, c.required_signature,
+       oi.order_item_id, oi.quantity, oi.item_price,
+       mi.menu_name,
+       opt.option_item_name, opt.option_price, oio.quantity as option_quantity, oio.total_price as option_total_price
+FROM "order" o
+JOIN company c ON c.company_id = o.company_id
+LEFT JOIN order_item oi ON oi.order_id = o.order_id
+LEFT JOIN menu_item mi ON mi.menu_item_id = oi.menu_item_id
+LEFT JOIN order_item_option oio ON oio.order_item_id = oi.order_item_id
+LEFT JOIN option_item opt ON opt.option_item_id = oio.option_item_id
+"""
+
+# 최근 주문 limit개와 상세 정보를 한 번에 조회 (최근 주문부터)
+_RECENT_ORDER_DETAILS_SQL = _ORDER_DETAILS_SELECT + """
+WHERE o.order_id IN (
+    SELECT order_id FROM "order" ORDER BY created_at DESC LIMIT ?
+)
+ORDER BY o.created_at DESC, o.order_id, oi.order_item_id
+"""
+
+
+@functools.lru_cache(maxsize=64)
+def _order_details_sql(count: int) -> str:
+    """주문 ID count개에 대한 상세 조인 쿼리 (개수마다 같은 문자열이라 문장 캐시에서 재사용)"""
+    placeholders = ",".join(["?"] * count)
+    return _ORDER_DETAILS_SELECT + f"""
+WHERE o.order_id IN ({placeholders})
+ORDER BY o.order_id, oi.order_item_id
+"""
+
+
 class SupabaseCache:
     """SQLite에 Supabase 테이블을 캐싱합니다."""
 
-    def __init__(self, db_path: Path = DB_PATH, supabase_config: Optional[Dict[str, str]] = None) -> None:
+    def __init__(self, db_path: Path = DB_PATH, supabase_config: Optional[Dict[str, str]] = None,
+                 session: Optional[requests.Session] = None) -> None:
         self.db_path = Path(db_path)
+        # HTTP 요청에 사용할 세션 (없으면 requests 모듈 함수 사용)
+        self.session = session or requests
         self.base_url = supabase_config.get('url') if supabase_config else None
         self.api_key = supabase_config.get('api_key') if supabase_config else None
         self.headers = {
             "apikey": self.api_key or "",
             "Authorization": f"Bearer {self.api_key}" if self.api_key else "",
         }
+        # 테이블별 마지막 응답의 ETag / 본문 해시 (변경 없으면 SQLite 재작성 생략)
+        self._table_etags: Dict[str, str] = {}
+        self._table_digests: Dict[str, str] = {}
+        # 테이블별 SQLite 재작성 횟수 (값이 그대로면 내용도 그대로)
+        self._table_revisions: Dict[str, int] = {}
+        # 재사용하는 SQLite 연결 (처음 사용할 때 생성, 여러 스레드가 잠금으로 공유)
+        self._conn: Optional[sqlite3.Connection] = None
+        self.conn_lock = threading.RLock()
 
     # ------------------------------------------------------------------
+    def _connect(self) -> sqlite3.Connection:
+        """성능 설정을 적용한 SQLite 연결을 엽니다."""
+        conn = sqlite3.connect(self.db_path)
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """공유 연결을 잠금을 잡은 채로 빌려줍니다 (자동 커밋 모드, sqlite3.Row)."""
+        with self.conn_lock:
+            if self._conn is None:
+                conn = sqlite3.connect(
+                    self.db_path,
+                    isolation_level=None,
+                    check_same_thread=False,
+                    cached_statements=256,
+                )
+                conn.row_factory = sqlite3.Row
+                for pragma in CONNECTION_PRAGMAS:
+                    conn.execute(pragma)
+                self._conn = conn
+            yield self._conn
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """공유 연결에서 쓰기 트랜잭션을 엽니다 (예외 시 롤백)."""
+        with self.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+
+    def close(self) -> None:
+        """공유 연결을 통계 갱신(PRAGMA optimize) 후 닫습니다."""
+        with self.conn_lock:
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute("PRAGMA optimize")
+            except sqlite3.Error as e:
+                logger.warning(f"PRAGMA optimize 실패: {e}")
+            self._conn.close()
+            self._conn = None
+
     def setup_sqlite(self) -> None:
         """로컬 SQLite 데이터베이스와 테이블을 초기화합니다."""
         try:
-            conn = sqlite3.connect(self.db_path)
+            conn = self._connect()
+            # WAL 모드 (읽기와 쓰기가 서로 막지 않음, DB 파일에 유지됨)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+            except sqlite3.Error as e:
+                logger.warning(f"WAL 모드 설정 실패: {e}")
             with open(SCHEMA_PATH, "r", encoding="utf-8") as f:
                 sql = f.read()
             
@@ -117,20 +246,120 @@ class SupabaseCache:
             conn.close()
 
     # ------------------------------------------------------------------
-    def fetch_and_store_table(self, table_name: str) -> None:
-        """Supabase에서 테이블을 가져와 SQLite에 저장합니다."""
+    def fetch_and_store_table(self, table_name: str) -> bool:
+        """Supabase에서 테이블을 가져와 SQLite에 저장합니다.
+
+        서버가 응답했으면 True, 설정이 없거나 시간 초과면 False를 반환합니다.
+        """
+        if not self.base_url:
+            return False
+        ok, rows, digest = self._download_table(table_name)
+        if rows:
+            return table_name in self._write_tables([(table_name, rows, digest)])
+        return ok
+
+    def fetch_and_store_tables(self, table_names: List[str], executor=None) -> Dict[str, bool]:
+        """여러 테이블을 가져와 하나의 트랜잭션(executemany)으로 SQLite에 저장합니다.
+
+        executor가 주어지면 HTTP 요청을 병렬로 보냅니다. 테이블별로 응답을 받아 저장까지 했는지를
+        반환하며, 한 테이블의 요청이나 저장이 실패해도 나머지 테이블은 저장합니다.
+        """
+        if not self.base_url:
+            return {table_name: False for table_name in table_names}
+        if executor is not None and len(table_names) > 1:
+            results = list(executor.map(self._download_table_safe, table_names))
+        else:
+            results = [self._download_table_safe(t) for t in table_names]
+        changed = [(table_name, rows, digest)
+                   for table_name, (ok, rows, digest) in zip(table_names, results) if rows]
+        stored = self._write_tables(changed) if changed else set()
+        return {table_name: ok and (not rows or table_name in stored)
+                for table_name, (ok, rows, _) in zip(table_names, results)}
+
+    def _download_table_safe(self, table_name: str) -> Tuple[bool, Optional[List[Dict[str, Any]]], Optional[str]]:
+        """테이블을 내려받습니다 (실패 시 경고만 기록하고 응답 없음으로 처리)."""
+        try:
+            return self._download_table(table_name)
+        except Exception as e:
+            logger.warning(f"테이블 {table_name} 동기화 실패: {e}")
+            return False, None, None
+
+    def fetch_new_rows(self, table_names: List[str], executor=None) -> bool:
+        """로컬의 마지막 키보다 큰 행만 가져와 추가합니다.
+
+        수정되거나 삭제된 기존 행은 반영하지 않으므로 주기적인 전체 동기화와 함께 사용합니다.
+        모든 테이블이 응답했으면 True.
+        """
         if not self.base_url:
-            return
+            return False
+        for table_name in table_names:
+            if table_name not in INCREMENTAL_KEYS:
+                raise ValueError(f"Incremental sync not supported: {table_name}")
+        with self.connection() as conn:
+            watermarks = {
+                table_name: conn.execute(
+                    f'SELECT coalesce(max("{INCREMENTAL_KEYS[table_name]}"), 0) FROM "{table_name}"'
+                ).fetchone()[0]
+                for table_name in table_names
+            }
+        if executor is not None and len(table_names) > 1:
+            futures = [executor.submit(self._download_new_rows, t, watermarks[t]) for t in table_names]
+            results = [f.result() for f in futures]
+        else:
+            results = [self._download_new_rows(t, watermarks[t]) for t in table_names]
+        new_rows = [(table_name, rows) for table_name, (ok, rows) in zip(table_names, results) if rows]
+        if new_rows:
+            with self.transaction() as conn:
+                for table_name, rows in new_rows:
+                    cols = list(rows[0].keys())
+                    placeholders = ",".join(["?"] * len(cols))
+                    quoted_cols = ",".join([f'"{c}"' for c in cols])
+                    conn.executemany(
+                        f'INSERT OR REPLACE INTO "{table_name}" ({quoted_cols}) VALUES ({placeholders})',
+                        ([row.get(col) for col in cols] for row in rows)
+                    )
+            for table_name, _ in new_rows:
+                self._table_revisions[table_name] = self._table_revisions.get(table_name, 0) + 1
+        return all(ok for ok, _ in results)
+
+    def _download_new_rows(self, table_name: str, after: int) -> Tuple[bool, List[Dict[str, Any]]]:
+        """키가 after보다 큰 행만 내려받습니다. (응답 여부, 행 목록)"""
+        key = INCREMENTAL_KEYS[table_name]
+        try:
+            resp = self.session.get(
+                f"{self.base_url}/rest/v1/{table_name}",
+                headers=self.headers,
+                params={"select": "*", key: f"gt.{after}", "order": f"{key}.asc"},
+                timeout=10,
+            )
+            resp.raise_for_status()
+        except requests.Timeout:
+            logger.error("Timeout while fetching new rows of '%s'", table_name)
+            return False, []
+        except requests.RequestException as e:
+            # 한 테이블의 실패가 다른 테이블의 결과까지 버리지 않도록 응답 없음으로 처리
+            logger.warning(f"테이블 {table_name} 새 행 조회 실패: {e}")
+            return False, []
+        return True, resp.json()
+
+    def _download_table(self, table_name: str) -> Tuple[bool, Optional[List[Dict[str, Any]]], Optional[str]]:
+        """테이블을 내려받습니다. (응답 여부, 새로 저장할 행 또는 None, 본문 해시)"""
         if table_name not in VALID_TABLES:
             raise ValueError(f"Invalid table name: {table_name}")
         params = {"select": "*"}
+        headers = self.headers
+        etag = self._table_etags.get(table_name)
+        if etag:
+            headers = {**self.headers, "If-None-Match": etag}
         try:
-            resp = requests.get(
+            resp = self.session.get(
                 f"{self.base_url}/rest/v1/{table_name}",
-                headers=self.headers,
+                headers=headers,
                 params=params,
                 timeout=10,
             )
+            if resp.status_code == 304:
+                return True, None, None
             resp.raise_for_status()
         except requests.Timeout:
             logger.error("Timeout while fetching table '%s'", table_name)
@@ -142,49 +371,77 @@ class SupabaseCache:
                     error=Exception(f"Timeout while fetching table '{table_name}'"),
                     method="GET"
                 )
-            return
-        rows = resp.json()
-        if not rows:
-            return
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        cursor.execute(f'DELETE FROM "{table_name}"')
-        cols = list(rows[0].keys())
-        placeholders = ",".join(["?"] * len(cols))
-        quoted_cols = ",".join([f'"{c}"' for c in cols])
-        insert_sql = f'INSERT INTO "{table_name}" ({quoted_cols}) VALUES ({placeholders})'
-        for row in rows:
-            values = [row.get(col) for col in cols]
-            cursor.execute(insert_sql, values)
-        conn.commit()
-        conn.close()
+            return False, None, None
+        if resp.headers.get("ETag"):
+            self._table_etags[table_name] = resp.headers["ETag"]
+        # 이전 동기화와 내용이 같으면 테이블을 다시 쓰지 않음
+        digest = hashlib.sha1(resp.content).hexdigest()
+        if self._table_digests.get(table_name) == digest:
+            return True, None, digest
+        return True, resp.json() or None, digest
+
+    def _write_tables(self, tables: List[Tuple[str, List[Dict[str, Any]], str]]) -> set:
+        """내려받은 테이블들을 한 트랜잭션으로 교체 저장하고 저장에 성공한 테이블 이름을 반환합니다."""
+        stored = set()
+        # 삭제와 삽입을 하나의 트랜잭션으로, 테이블마다 SAVEPOINT를 두어 실패한 테이블만 롤백
+        with self.transaction() as conn:
+            for table_name, rows, _ in tables:
+                cols = list(rows[0].keys())
+                placeholders = ",".join(["?"] * len(cols))
+                quoted_cols = ",".join([f'"{c}"' for c in cols])
+                insert_sql = f'INSERT INTO "{table_name}" ({quoted_cols}) VALUES ({placeholders})'
+                conn.execute("SAVEPOINT write_table")
+                try:
+                    conn.execute(f'DELETE FROM "{table_name}"')
+                    conn.executemany(insert_sql, ([row.get(col) for col in cols] for row in rows))
+                except sqlite3.Error as e:
+                    conn.execute("ROLLBACK TO write_table")
+                    conn.execute("RELEASE write_table")
+                    logger.error(f"테이블 {table_name} 저장 실패: {e}")
+                    # 다음 동기화에서 304로 건너뛰지 않고 다시 받도록 ETag를 버림
+                    self._table_etags.pop(table_name, None)
+                    continue
+                conn.execute("RELEASE write_table")
+                stored.add(table_name)
+        for table_name, _, digest in tables:
+            if table_name in stored:
+                self._table_digests[table_name] = digest
+                self._table_revisions[table_name] = self._table_revisions.get(table_name, 0) + 1
+        return stored
+
+    def table_revision(self, table_name: str) -> int:
+        """이 인스턴스가 테이블을 다시 쓴 횟수를 반환합니다 (0이면 아직 쓰지 않음)."""
+        return self._table_revisions.get(table_name, 0)
 
     # ------------------------------------------------------------------
     def join_order_detail(self, order_id: int) -> Dict[str, Any]:
         """주문과 관련 테이블을 조인하여 상세 정보를 반환합니다."""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        query = """
-        SELECT o.order_id, o.is_dine_in, o.total_price, o.created_at, o.signature_data,
-               o.print_status, o.print_attempts, o.last_print_attempt, o.is_printed,
-               c.company_name, c.required_signature,
-               oi.order_item_id, oi.quantity, oi.item_price,
-               mi.menu_name,
-               opt.option_item_name, opt.option_price, oio.quantity as option_quantity, oio.total_price as option_total_price
-        FROM "order" o
-        JOIN company c ON c.company_id = o.company_id
-        LEFT JOIN order_item oi ON oi.order_id = o.order_id
-        LEFT JOIN menu_item mi ON mi.menu_item_id = oi.menu_item_id
-        LEFT JOIN order_item_option oio ON oio.order_item_id = oi.order_item_id
-        LEFT JOIN option_item opt ON opt.option_item_id = oio.option_item_id
-        WHERE o.order_id = ?
-        ORDER BY oi.order_item_id
-        """
-        rows = cursor.execute(query, (order_id,)).fetchall()
-        conn.close()
-        if not rows:
+        return self.join_order_details([order_id]).get(order_id, {})
+
+    def join_order_details(self, order_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """여러 주문의 상세 정보를 한 번의 조인 쿼리로 가져옵니다 (order_id -> 상세 정보)."""
+        if not order_ids:
             return {}
+        query = _order_details_sql(len(order_ids))
+        with self.connection() as conn:
+            rows = conn.execute(query, list(order_ids)).fetchall()
+        return {
+            order_id: self._build_order_detail(list(group))
+            for order_id, group in groupby(rows, key=lambda row: row["order_id"])
+        }
+
+    def get_recent_orders_with_details(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """최근 주문들의 상세 정보를 한 번의 조인 쿼리로 가져옵니다 (최근 주문부터)."""
+        with self.connection() as conn:
+            rows = conn.execute(_RECENT_ORDER_DETAILS_SQL, (limit,)).fetchall()
+        return [
+            self._build_order_detail(list(group))
+            for _, group in groupby(rows, key=lambda row: row["order_id"])
+        ]
+
+    @staticmethod
+    def _build_order_detail(rows: List[sqlite3.Row]) -> Dict[str, Any]:
+        """한 주문의 조인 결과 행들을 상세 정보 dict로 변환합니다."""
         order: Dict[str, Any] = {
             "order_id": rows[0]["order_id"],
             "company_name": rows[0]["company_name"],
@@ -223,60 +480,47 @@ class SupabaseCache:
 
     # ------------------------------------------------------------------
     def get_recent_orders(self, limit: int = 50) -> List[Dict[str, Any]]:
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        query = """
-        SELECT o.order_id, o.company_id, o.is_dine_in, o.total_price, o.created_at, o.signature_data,
-               o.is_printed, o.print_status, o.print_attempts, o.last_print_attempt,
-               c.company_name, c.required_signature
-        FROM "order" o
-        JOIN company c ON c.company_id = o.company_id
-        ORDER BY o.created_at DESC
-        LIMIT ?
-        """
-        rows = cursor.execute(query, (limit,)).fetchall()
-        conn.close()
+        with self.connection() as conn:
+            rows = conn.execute(_RECENT_ORDERS_SQL, (limit,)).fetchall()
         return [dict(row) for row in rows]
 
+    def count_table_rows(self, table_names: List[str]) -> Dict[str, int]:
+        """여러 테이블의 행 수를 한 번의 연결로 조회합니다."""
+        for table_name in table_names:
+            if table_name not in VALID_TABLES:
+                raise ValueError(f"Invalid table name: {table_name}")
+        with self.connection() as conn:
+            return {
+                table_name: conn.execute(f'SELECT count(*) FROM "{table_name}"').fetchone()[0]
+                for table_name in table_names
+            }
+
     def get_table_data(self, table_name: str) -> List[Dict[str, Any]]:
         """테이블의 모든 데이터를 가져옵니다."""
         if table_name not in VALID_TABLES:
             raise ValueError(f"Invalid table name: {table_name}")
             
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
-        try:
-            cursor.execute(f'SELECT * FROM "{table_name}"')
-            rows = cursor.fetchall()
-            return [dict(row) for row in rows]
-        finally:
-            conn.close()
+        with self.connection() as conn:
+            rows = conn.execute(f'SELECT * FROM "{table_name}"').fetchall()
+        return [dict(row) for row in rows]
 
     def delete_order_from_cache(self, order_id: int) -> bool:
         """로컬 캐시에서 주문을 삭제합니다."""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            # 주문 항목 옵션 삭제
-            cursor.execute("""
-                DELETE FROM order_item_option 
-                WHERE order_item_id IN (
-                    SELECT order_item_id FROM order_item WHERE order_id = ?
-                )
-            """, (order_id,))
-            
-            # 주문 항목 삭제
-            cursor.execute('DELETE FROM order_item WHERE order_id = ?', (order_id,))
-            
-            # 주문 삭제
-            cursor.execute('DELETE FROM "order" WHERE order_id = ?', (order_id,))
-            
-            conn.commit()
-            conn.close()
+            with self.transaction() as conn:
+                # 주문 항목 옵션 삭제
+                conn.execute("""
+                    DELETE FROM order_item_option 
+                    WHERE order_item_id IN (
+                        SELECT order_item_id FROM order_item WHERE order_id = ?
+                    )
+                """, (order_id,))
+                
+                # 주문 항목 삭제
+                conn.execute('DELETE FROM order_item WHERE order_id = ?', (order_id,))
+                
+                # 주문 삭제
+                conn.execute('DELETE FROM "order" WHERE order_id = ?', (order_id,))
             
             logger.info(f"로컬 캐시에서 주문 {order_id} 삭제 성공")
             return True
@@ -68,6 +68,11 @@ CREATE TABLE IF NOT EXISTS "order" (
   FOREIGN KEY (company_id) REFERENCES company(company_id)
 );
 
+CREATE INDEX IF NOT EXISTS idx_order_created_at ON "order"(created_at DESC);
+
+-- 미출력 주문 조회용 부분 인덱스 (is_printed = 0 행만 포함)
+CREATE INDEX IF NOT EXISTS idx_order_unprinted_ts ON "order"(created_at DESC) WHERE is_printed = 0;
+
 CREATE TABLE IF NOT EXISTS order_item (
   order_item_id INTEGER PRIMARY KEY AUTOINCREMENT,
   order_id INTEGER NOT NULL,
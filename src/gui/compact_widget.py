@@ -1,5 +1,5 @@
 from PySide6.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QProgressBar
-from PySide6.QtCore import Qt, Signal, QTimer
+from PySide6.QtCore import Qt, Signal, QTimer, QPoint
 from PySide6.QtGui import QFont, QMouseEvent
 import logging
 
@@ -10,10 +10,49 @@ class CompactWidget(QWidget):
     """
     # 시그널 정의
     expand_requested = Signal()  # 전체 GUI로 전환 요청
+
+    # 위젯 스타일시트 템플릿 ({background}: 긴급도에 따른 배경색)
+    _STYLE_TEMPLATE = """
+        QWidget {
+            background-color: {background};
+            color: white;
+            border-radius: 8px;
+        }
+        QLabel {
+            background: transparent;
+            border: none;
+        }
+        QPushButton {
+            background-color: #34495e;
+            border: 1px solid #4a6741;
+            border-radius: 3px;
+            color: white;
+            font-weight: bold;
+        }
+        QPushButton:hover {
+            background-color: #4a6741;
+        }
+        QPushButton:pressed {
+            background-color: #3d5a3d;
+        }
+        QProgressBar {
+            border: none;
+            background-color: #34495e;
+            border-radius: 2px;
+        }
+        QProgressBar::chunk {
+            background-color: #27ae60;
+            border-radius: 2px;
+        }
+    """
+    
+    # 드래그 시 이 거리(px) 이상 누적되었을 때만 창 이동
+    DRAG_MOVE_THRESHOLD = 2
     
     def __init__(self, order_data_callback=None):
         super().__init__()
         self.order_data_callback = order_data_callback
+        self._pending_delta = QPoint(0, 0)
         self.setup_ui()
         self.setup_update_timer()
         
@@ -94,46 +133,29 @@ class CompactWidget(QWidget):
         
         layout.addLayout(bottom_layout)
         
-        # 전체 스타일 설정
-        self.setStyleSheet("""
-            QWidget {
-                background-color: #2c3e50;
-                color: white;
-                border-radius: 8px;
-            }
-            QLabel {
-                background: transparent;
-                border: none;
-            }
-            QPushButton {
-                background-color: #34495e;
-                border: 1px solid #4a6741;
-                border-radius: 3px;
-                color: white;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #4a6741;
-            }
-            QPushButton:pressed {
-                background-color: #3d5a3d;
-            }
-            QProgressBar {
-                border: none;
-                background-color: #34495e;
-                border-radius: 2px;
-            }
-            QProgressBar::chunk {
-                background-color: #27ae60;
-                border-radius: 2px;
-            }
-        """)
+        # 전체 스타일 설정 (긴급도별 스타일시트는 미리 만들어 두고 상태가 바뀔 때만 교체)
+        self._css_normal = self._STYLE_TEMPLATE.replace("{background}", "#2c3e50")
+        self._css_warn = self._STYLE_TEMPLATE.replace("{background}", "#f39c12")  # 주황색
+        self._css_urgent = self._STYLE_TEMPLATE.replace("{background}", "#c0392b")  # 빨간색
+        self._current_level = "normal"
+        self.setStyleSheet(self._css_normal)
         
     def setup_update_timer(self):
         """데이터 업데이트 타이머 설정"""
+        # 5초마다 업데이트 (위젯이 보이는 동안에만 동작, showEvent/hideEvent 참고)
         self.update_timer = QTimer()
+        self.update_timer.setInterval(5000)
         self.update_timer.timeout.connect(self.update_data)
-        self.update_timer.start(5000)  # 5초마다 업데이트
+        
+    def showEvent(self, event):
+        """위젯 표시 시 업데이트 타이머 시작"""
+        self.update_timer.start()
+        super().showEvent(event)
+        
+    def hideEvent(self, event):
+        """위젯 숨김 시 업데이트 타이머 중지"""
+        self.update_timer.stop()
+        super().hideEvent(event)
         
     def mouseDoubleClickEvent(self, event: QMouseEvent):
         """더블클릭 이벤트 - 전체 GUI로 전환"""
@@ -146,18 +168,35 @@ class CompactWidget(QWidget):
         """마우스 드래그를 위한 위치 저장"""
         if event.button() == Qt.MouseButton.LeftButton:
             self.drag_start_position = event.globalPosition().toPoint()
+            self._pending_delta = QPoint(0, 0)
         super().mousePressEvent(event)
         
     def mouseMoveEvent(self, event: QMouseEvent):
-        """위젯 드래그 이동"""
+        """위젯 드래그 이동 (작은 이동량은 누적 후 한 번에 반영)"""
         if hasattr(self, 'drag_start_position') and event.buttons() == Qt.MouseButton.LeftButton:
-            diff = event.globalPosition().toPoint() - self.drag_start_position
-            self.move(self.pos() + diff)
-            self.drag_start_position = event.globalPosition().toPoint()
+            current_position = event.globalPosition().toPoint()
+            self._pending_delta += current_position - self.drag_start_position
+            self.drag_start_position = current_position
+            if self._pending_delta.manhattanLength() >= self.DRAG_MOVE_THRESHOLD:
+                self._commit_move()
         super().mouseMoveEvent(event)
         
+    def mouseReleaseEvent(self, event: QMouseEvent):
+        """드래그 종료 시 남은 이동량 반영"""
+        if event.button() == Qt.MouseButton.LeftButton:
+            self._commit_move()
+        super().mouseReleaseEvent(event)
+        
+    def _commit_move(self):
+        """누적된 드래그 이동량을 창 위치에 반영"""
+        if not self._pending_delta.isNull():
+            self.move(self.pos() + self._pending_delta)
+            self._pending_delta = QPoint(0, 0)
+        
     def update_data(self):
         """주문 데이터 업데이트"""
+        if not self.isVisible():
+            return
         try:
             if self.order_data_callback:
                 data = self.order_data_callback()
@@ -174,13 +213,16 @@ class CompactWidget(QWidget):
         pending_count = data.get('pending_orders', 0)
         self.pending_orders_label.setText(f"대기 주문: {pending_count}개")
         
-        # 배경색 변경 (긴급도에 따라)
+        # 배경색 변경 (긴급도에 따라, 단계가 바뀔 때만 스타일시트 교체)
         if pending_count > 5:
-            self.setStyleSheet(self.styleSheet().replace("#2c3e50", "#c0392b"))  # 빨간색
+            level, css = "urgent", self._css_urgent
         elif pending_count > 2:
-            self.setStyleSheet(self.styleSheet().replace("#2c3e50", "#f39c12"))  # 주황색
+            level, css = "warn", self._css_warn
         else:
-            self.setStyleSheet(self.styleSheet().replace("#c0392b", "#2c3e50").replace("#f39c12", "#2c3e50"))  # 기본색
+            level, css = "normal", self._css_normal
+        if level != self._current_level:
+            self._current_level = level
+            self.setStyleSheet(css)
             
         # 마지막 업데이트 시간
         from datetime import datetime
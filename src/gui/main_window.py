@@ -1,12 +1,12 @@
-from PySide6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QTabWidget, QTextEdit, QPushButton, QHBoxLayout, QMessageBox
-from PySide6.QtCore import Qt, QThread, Signal, Slot
+from PySide6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QTabWidget, QPlainTextEdit, QPushButton, QHBoxLayout, QMessageBox
+from PySide6.QtCore import Qt, QObject, QThread, Signal, Slot
 from PySide6.QtGui import QFont
 from src.gui.order_widget import OrderWidget
 from src.gui.printer_widget import PrinterWidget
 from src.supabase_client import SupabaseClient
-from src.gui.receipt_preview import read_receipt_file
+from src.gui.receipt_preview import read_receipt_file, receipt_file_stamp
 from src.updater import check_and_update, get_current_version
-from src.error_logger import get_error_logger
+from src.error_logger import get_error_logger, shutdown_error_logger
 import os
 import logging
 import subprocess
@@ -14,13 +14,127 @@ import sys
 
 
 
+# 메인 윈도우 스타일시트 (모듈 로드 시 한 번만 생성)
+_MAIN_QSS = """
+    QMainWindow {
+        background-color: #f0f0f0;
+    }
+    QTabWidget::pane {
+        border: 1px solid #cccccc;
+        background: white;
+    }
+    QTabBar::tab {
+        background: #e1e1e1;
+        border: 1px solid #cccccc;
+        padding: 8px 12px;
+        margin-right: 2px;
+    }
+    QTabBar::tab:selected {
+        background: white;
+        border-bottom-color: white;
+    }
+    QTabBar::tab:hover {
+        background: #f0f0f0;
+    }
+    QGroupBox {
+        font-weight: bold;
+        border: 1px solid #cccccc;
+        border-radius: 5px;
+        margin-top: 10px;
+        padding-top: 10px;
+    }
+    QGroupBox::title {
+        subcontrol-origin: margin;
+        left: 10px;
+        padding: 0 3px 0 3px;
+    }
+    QPushButton {
+        background-color: #4a90e2;
+        color: white;
+        border: none;
+        padding: 5px 10px;
+        border-radius: 3px;
+    }
+    QPushButton:hover {
+        background-color: #357abd;
+    }
+    QPushButton:pressed {
+        background-color: #2a5f96;
+    }
+"""
+
+
+class GitUpdateWorker(QObject):
+    """Git 명령을 UI 스레드 밖에서 실행하는 워커 (QThread로 이동하여 사용)"""
+    
+    status_ready = Signal(str)  # git status --porcelain 출력 (실패 시 빈 문자열)
+    pull_ready = Signal(int, str, str)  # git pull (returncode, stdout, stderr)
+    failed = Signal(str, str)  # (오류 종류: timeout/not_found/error, 메시지)
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._process = None  # 실행 중인 git 프로세스 (종료 시 강제 중단용)
+    
+    @Slot(str)
+    def check_status(self, cwd):
+        """git status 실행"""
+        try:
+            returncode, stdout, _ = self._run_git(["git", "status", "--porcelain"], cwd, timeout=10)
+            self.status_ready.emit(stdout if returncode == 0 else "")
+        except Exception as e:
+            self._emit_failure(e)
+    
+    @Slot(str)
+    def pull(self, cwd):
+        """git pull 실행"""
+        try:
+            returncode, stdout, stderr = self._run_git(["git", "pull", "--no-progress"], cwd, timeout=60)  # 60초 타임아웃
+            self.pull_ready.emit(returncode, stdout, stderr)
+        except Exception as e:
+            self._emit_failure(e)
+    
+    def _run_git(self, args, cwd, timeout):
+        process = subprocess.Popen(
+            args,
+            cwd=cwd,
+            stdin=subprocess.DEVNULL,  # 인증 프롬프트 등으로 입력을 기다리며 멈추지 않도록
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True
+        )
+        self._process = process
+        try:
+            stdout, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise
+        finally:
+            self._process = None
+        return process.returncode, stdout, stderr
+    
+    def kill_running(self):
+        """실행 중인 git 프로세스 강제 종료 (다른 스레드에서 호출 가능)"""
+        process = self._process
+        if process is not None and process.poll() is None:
+            process.kill()
+    
+    def _emit_failure(self, error):
+        if isinstance(error, subprocess.TimeoutExpired):
+            self.failed.emit("timeout", str(error))
+        elif isinstance(error, FileNotFoundError):
+            self.failed.emit("not_found", str(error))
+        else:
+            self.failed.emit("error", str(error))
+
+
 class ReceiptPreviewWidget(QWidget):
     def __init__(self):
         super().__init__()
         layout = QVBoxLayout(self)
         
         # 미리보기 텍스트 영역
-        self.preview_text = QTextEdit()
+        self.preview_text = QPlainTextEdit()
         self.preview_text.setReadOnly(True)
         self.preview_text.setFont(QFont("Courier New", 10))  # 고정폭 폰트 사용
         
@@ -31,17 +145,36 @@ class ReceiptPreviewWidget(QWidget):
         layout.addWidget(refresh_btn)
         layout.addWidget(self.preview_text)
         
-        # 초기 미리보기 로드
+        # 미리보기는 탭이 표시될 때 로드 (시작 시 파일 I/O 방지)
+        self._last_stamp = None  # 마지막으로 읽은 파일의 (수정 시각, 크기)
+        self._loaded = False
+        
+    def showEvent(self, event):
+        """탭이 표시될 때 파일이 바뀌었으면 미리보기 갱신"""
+        super().showEvent(event)
         self.refresh_preview()
         
     def refresh_preview(self):
+        # 파일이 그대로면 다시 읽지 않음
+        stamp = receipt_file_stamp()
+        if self._loaded and stamp is not None and stamp == self._last_stamp:
+            return
+        self._last_stamp = stamp
+        self._loaded = True
+        
         preview_text = read_receipt_file()
+        self.preview_text.setUpdatesEnabled(False)
         if preview_text:
-            self.preview_text.setText(preview_text)
+            self.preview_text.setPlainText(preview_text)
         else:
-            self.preview_text.setText("영수증 미리보기를 불러올 수 없습니다.")
+            self.preview_text.setPlainText("영수증 미리보기를 불러올 수 없습니다.")
+        self.preview_text.setUpdatesEnabled(True)
 
 class MainWindow(QMainWindow):
+    # Git 워커 스레드로 작업 요청 (작업 디렉토리 전달)
+    git_status_requested = Signal(str)
+    git_pull_requested = Signal(str)
+    
     def __init__(self, supabase_config, db_config):
         super().__init__()
         self.setWindowTitle("주문 관리 시스템")
@@ -50,6 +183,12 @@ class MainWindow(QMainWindow):
         # WindowManager는 나중에 설정됨 (main.py에서)
         self.window_manager = None
         
+        # Git 업데이트 워커 (첫 업데이트 요청 시 생성)
+        self._git_thread = None
+        self._git_worker = None
+        self._git_cwd = None
+        self._update_btn_text = None
+        
         # 중앙 위젯 설정
         central_widget = QWidget()
         self.setCentralWidget(central_widget)
@@ -135,115 +274,87 @@ class MainWindow(QMainWindow):
         self.supabase_client = SupabaseClient()
         
         # 윈도우 설정
-        self.setStyleSheet("""
-            QMainWindow {
-                background-color: #f0f0f0;
-            }
-            QTabWidget::pane {
-                border: 1px solid #cccccc;
-                background: white;
-            }
-            QTabBar::tab {
-                background: #e1e1e1;
-                border: 1px solid #cccccc;
-                padding: 8px 12px;
-                margin-right: 2px;
-            }
-            QTabBar::tab:selected {
-                background: white;
-                border-bottom-color: white;
-            }
-            QTabBar::tab:hover {
-                background: #f0f0f0;
-            }
-            QGroupBox {
-                font-weight: bold;
-                border: 1px solid #cccccc;
-                border-radius: 5px;
-                margin-top: 10px;
-                padding-top: 10px;
-            }
-            QGroupBox::title {
-                subcontrol-origin: margin;
-                left: 10px;
-                padding: 0 3px 0 3px;
-            }
-            QPushButton {
-                background-color: #4a90e2;
-                color: white;
-                border: none;
-                padding: 5px 10px;
-                border-radius: 3px;
-            }
-            QPushButton:hover {
-                background-color: #357abd;
-            }
-            QPushButton:pressed {
-                background-color: #2a5f96;
-            }
-        """)
+        self.setStyleSheet(_MAIN_QSS)
     
     @Slot()
     def update_from_git(self):
         """Git 저장소에서 최신 코드를 가져와 업데이트합니다."""
-        try:
-            # 확인 팝업 표시
-            reply = QMessageBox.question(
+        # 확인 팝업 표시
+        reply = QMessageBox.question(
+            self,
+            "업데이트 확인",
+            "Git 저장소에서 최신 코드를 가져오시겠습니까?\n\n※ 로컬 변경사항이 있다면 덮어씌워질 수 있습니다.",
+            QMessageBox.Yes | QMessageBox.No,
+            QMessageBox.No
+        )
+        
+        if reply != QMessageBox.Yes:
+            return
+        
+        # 버튼 상태 변경
+        self._update_btn_text = self.update_btn.text()
+        self.update_btn.setText("업데이트 중...")
+        self.update_btn.setEnabled(False)
+        
+        logging.info("Git 업데이트 시작")
+        
+        # 현재 작업 디렉토리 가져오기 (프로젝트 루트)
+        self._git_cwd = os.getcwd()
+        logging.info(f"현재 작업 디렉토리: {self._git_cwd}")
+        
+        # Git 상태 확인 (워커 스레드에서 실행)
+        self._ensure_git_worker()
+        self.git_status_requested.emit(self._git_cwd)
+    
+    def _ensure_git_worker(self):
+        """Git 워커 스레드를 생성하고 시그널을 연결합니다."""
+        if self._git_thread is not None:
+            return
+        
+        self._git_thread = QThread(self)
+        self._git_worker = GitUpdateWorker()
+        self._git_worker.moveToThread(self._git_thread)
+        
+        self.git_status_requested.connect(self._git_worker.check_status)
+        self.git_pull_requested.connect(self._git_worker.pull)
+        self._git_worker.status_ready.connect(self._on_git_status)
+        self._git_worker.pull_ready.connect(self._on_git_pull_done)
+        self._git_worker.failed.connect(self._on_git_failed)
+        self._git_thread.finished.connect(self._git_worker.deleteLater)
+        
+        self._git_thread.start()
+    
+    @Slot(str)
+    def _on_git_status(self, status_output):
+        """git status 결과 처리 후 git pull 요청"""
+        if status_output.strip():
+            # 변경 파일이 매우 많으면 대화상자에는 앞부분만 표시
+            if len(status_output) > 4096:
+                status_output = status_output[:4096] + "\n..."
+            
+            # 로컬 변경사항이 있는 경우 추가 확인
+            dirty_reply = QMessageBox.question(
                 self,
-                "업데이트 확인",
-                "Git 저장소에서 최신 코드를 가져오시겠습니까?\n\n※ 로컬 변경사항이 있다면 덮어씌워질 수 있습니다.",
+                "로컬 변경사항 발견",
+                f"다음 파일들에 변경사항이 있습니다:\n\n{status_output}\n\n계속 진행하면 변경사항이 손실될 수 있습니다. 계속하시겠습니까?",
                 QMessageBox.Yes | QMessageBox.No,
                 QMessageBox.No
             )
-            
-            if reply != QMessageBox.Yes:
+            if dirty_reply != QMessageBox.Yes:
+                self._finish_git_update()
                 return
-            
-            # 버튼 상태 변경
-            original_text = self.update_btn.text()
-            self.update_btn.setText("업데이트 중...")
-            self.update_btn.setEnabled(False)
-            
-            logging.info("Git 업데이트 시작")
-            
-            # 현재 작업 디렉토리 가져오기 (프로젝트 루트)
-            current_dir = os.getcwd()
-            logging.info(f"현재 작업 디렉토리: {current_dir}")
-            
-            # Git 상태 확인
-            git_status_result = subprocess.run(
-                ["git", "status", "--porcelain"],
-                cwd=current_dir,
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-            
-            if git_status_result.returncode == 0 and git_status_result.stdout.strip():
-                # 로컬 변경사항이 있는 경우 추가 확인
-                dirty_reply = QMessageBox.question(
-                    self,
-                    "로컬 변경사항 발견",
-                    f"다음 파일들에 변경사항이 있습니다:\n\n{git_status_result.stdout}\n\n계속 진행하면 변경사항이 손실될 수 있습니다. 계속하시겠습니까?",
-                    QMessageBox.Yes | QMessageBox.No,
-                    QMessageBox.No
-                )
-                if dirty_reply != QMessageBox.Yes:
-                    return
-            
-            # git pull 실행
-            logging.info("git pull 실행 중...")
-            result = subprocess.run(
-                ["git", "pull"],
-                cwd=current_dir,
-                capture_output=True,
-                text=True,
-                timeout=60  # 60초 타임아웃
-            )
-            
-            if result.returncode == 0:
+        
+        # git pull 실행 (워커 스레드에서 실행)
+        logging.info("git pull 실행 중...")
+        self.git_pull_requested.emit(self._git_cwd)
+    
+    @Slot(int, str, str)
+    def _on_git_pull_done(self, returncode, stdout, stderr):
+        """git pull 결과 처리"""
+        try:
+            if returncode == 0:
                 # 성공
-                output = result.stdout.strip()
+                output = stdout.strip()
                 logging.info(f"Git 업데이트 성공: {output}")
                 
                 if "Already up to date" in output or "이미 최신입니다" in output:
@@ -254,7 +365,10 @@ class MainWindow(QMainWindow):
                         "이미 최신 버전을 사용 중입니다."
                     )
                 else:
-                    # 업데이트됨 - 재시작 옵션 제공
+                    # 업데이트됨 - 새 version.json을 읽도록 캐시 무효화
+                    get_current_version.cache_clear()
+                    
+                    # 재시작 옵션 제공
                     restart_reply = QMessageBox.question(
                         self,
                         "업데이트 완료",
@@ -268,7 +382,7 @@ class MainWindow(QMainWindow):
                         self.restart_application()
             else:
                 # 실패
-                error_output = result.stderr.strip() or result.stdout.strip()
+                error_output = stderr.strip() or stdout.strip()
                 logging.error(f"Git 업데이트 실패: {error_output}")
                 
                 QMessageBox.critical(
@@ -276,28 +390,39 @@ class MainWindow(QMainWindow):
                     "업데이트 실패",
                     f"Git 업데이트에 실패했습니다.\n\n오류 내용:\n{error_output}\n\n네트워크 연결이나 Git 설정을 확인해주세요."
                 )
+        finally:
+            # 버튼 상태 복원
+            self._finish_git_update()
+    
+    @Slot(str, str)
+    def _on_git_failed(self, kind, message):
+        """Git 명령 실행 오류 처리"""
+        try:
+            if kind == "timeout":
+                logging.error("Git 업데이트 타임아웃")
+                QMessageBox.critical(self, "업데이트 실패", "업데이트 요청이 시간 초과되었습니다.\n네트워크 연결을 확인해주세요.")
                 
-        except subprocess.TimeoutExpired:
-            logging.error("Git 업데이트 타임아웃")
-            QMessageBox.critical(self, "업데이트 실패", "업데이트 요청이 시간 초과되었습니다.\n네트워크 연결을 확인해주세요.")
-            
-        except FileNotFoundError:
-            logging.error("Git 명령어를 찾을 수 없음")
-            QMessageBox.critical(self, "업데이트 실패", "Git이 설치되어 있지 않거나 PATH에 등록되어 있지 않습니다.\n\nGit을 설치하고 PATH에 추가한 후 다시 시도해주세요.")
-            
-        except Exception as e:
-            logging.error(f"Git 업데이트 중 예상치 못한 오류: {e}")
-            QMessageBox.critical(self, "업데이트 실패", f"업데이트 중 오류가 발생했습니다:\n\n{str(e)}")
-            
-            # Supabase에도 에러 로깅
-            error_logger = get_error_logger()
-            if error_logger:
-                error_logger.log_error(e, "Git 업데이트 오류", {"context": "git_update"})
-        
+            elif kind == "not_found":
+                logging.error("Git 명령어를 찾을 수 없음")
+                QMessageBox.critical(self, "업데이트 실패", "Git이 설치되어 있지 않거나 PATH에 등록되어 있지 않습니다.\n\nGit을 설치하고 PATH에 추가한 후 다시 시도해주세요.")
+                
+            else:
+                logging.error(f"Git 업데이트 중 예상치 못한 오류: {message}")
+                QMessageBox.critical(self, "업데이트 실패", f"업데이트 중 오류가 발생했습니다:\n\n{message}")
+                
+                # Supabase에도 에러 로깅
+                error_logger = get_error_logger()
+                if error_logger:
+                    error_logger.log_error(Exception(message), "Git 업데이트 오류", {"context": "git_update"})
         finally:
             # 버튼 상태 복원
-            self.update_btn.setText(original_text)
-            self.update_btn.setEnabled(True)
+            self._finish_git_update()
+    
+    def _finish_git_update(self):
+        """업데이트 버튼 상태를 복원합니다."""
+        if self._update_btn_text is not None:
+            self.update_btn.setText(self._update_btn_text)
+        self.update_btn.setEnabled(True)
 
     def restart_application(self):
         """애플리케이션을 재시작합니다."""
@@ -313,7 +438,17 @@ class MainWindow(QMainWindow):
                 executable = sys.executable
                 script_path = os.path.abspath(sys.argv[0])
             
-            # 새 프로세스 시작
+            # 창 정리 (closeEvent -> WindowManager 정리)
+            self.close()
+            
+            if not getattr(sys, 'frozen', False) and os.name != 'nt':
+                # POSIX 스크립트 실행: 현재 프로세스를 그대로 교체 (두 프로세스가 겹치지 않음)
+                # execv는 atexit 핸들러를 실행하지 않으므로 종료 정리 작업을 직접 수행
+                shutdown_error_logger()
+                logging.shutdown()
+                os.execv(executable, [executable, script_path, *sys.argv[1:]])
+            
+            # 새 프로세스 시작 (Windows/실행 파일은 execv가 새 프로세스를 띄우므로 기존 방식 유지)
             if getattr(sys, 'frozen', False):
                 # 실행 파일인 경우
                 subprocess.Popen([executable])
@@ -359,4 +494,17 @@ class MainWindow(QMainWindow):
         except Exception as e:
             logging.error(f"WindowManager 정리 중 오류: {e}")
         
+        # Git 워커 스레드 종료
+        if self._git_thread is not None:
+            self._git_thread.quit()
+            if not self._git_thread.wait(3000):
+                # git 명령이 아직 실행 중이면 프로세스를 종료시켜 워커가 빠져나오게 함
+                logging.warning("Git 작업이 끝나지 않아 강제 종료합니다.")
+                self._git_worker.kill_running()
+                if not self._git_thread.wait(2000):
+                    # 실행 중인 QThread가 파괴되면 Qt가 프로그램을 중단시키므로 마지막 수단으로 강제 종료
+                    logging.error("Git 작업 스레드가 종료되지 않아 강제 종료합니다.")
+                    self._git_thread.terminate()
+                    self._git_thread.wait()
+        
         super().closeEvent(event) 
\ No newline at end of file
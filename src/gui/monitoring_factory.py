@@ -1,10 +1,63 @@
+import copy
 import json
 import logging
+import os
+import threading
 from pathlib import Path
 from typing import Optional, Union
 
 from src.gui.order_monitor import SmartOrderMonitor
-from src.realtime.supabase_realtime import RealtimeOrderMonitor
+from src.realtime.supabase_realtime import RealtimeOrderMonitor, SupabaseRealtimeClient
+
+CONFIG_PATH = Path("monitor_config.json")
+CONFIG_VERSION = 1  # 설정 파일 형식 버전 (없으면 현재 버전으로 간주)
+
+# 파싱된 설정 캐시: (경로, st_mtime_ns) -> dict
+_CONFIG_CACHE = {}
+_CONFIG_LOCK = threading.Lock()
+
+
+class HybridMonitor:
+    """하이브리드 모니터 (실시간 + 폴링)
+    
+    실시간 구독으로 주문 변경을 받으면 폴링 스레드를 즉시 깨워 처리하고,
+    폴링은 연결이 끊겼을 때를 위한 느린 주기로만 동작한다.
+    출력은 폴링 스레드 한 곳에서만 하므로 중복 출력이 없다.
+    """
+    
+    def __init__(self, order_widget, supabase_config, db_config):
+        # 폴링 모니터 (주문 처리 담당, 느린 주기)
+        self.polling_monitor = SmartOrderMonitor(order_widget, supabase_config, db_config)
+        self.polling_monitor.monitor_thread.set_check_interval(60)  # 느린 폴링
+        
+        # 실시간 클라이언트 (변경 알림만 담당)
+        self.realtime_client = SupabaseRealtimeClient(
+            supabase_config['url'],
+            supabase_config['api_key']
+        )
+        self.realtime_client.order_inserted.connect(self._on_order_changed)
+        self.realtime_client.order_updated.connect(self._on_order_changed)
+
+    def _on_order_changed(self, _data):
+        # WebSocket 스레드에서 호출됨 - 이벤트만 설정
+        self.polling_monitor.monitor_thread.wake_up()
+
+    def start_monitoring(self):
+        self.polling_monitor.start_monitoring()
+        self.realtime_client.should_reconnect = True
+        self.realtime_client.connect()
+
+    def stop_monitoring(self):
+        self.realtime_client.disconnect()
+        self.polling_monitor.stop_monitoring()
+
+    def set_auto_print_mode(self, enabled: bool):
+        # 실시간 모니터는 자동 조정되므로 폴링만 조정
+        self.polling_monitor.monitor_thread.set_auto_print_enabled(enabled)
+        if enabled:
+            self.polling_monitor.monitor_thread.set_check_interval(30)
+        else:
+            self.polling_monitor.monitor_thread.set_check_interval(120)
 
 
 class MonitoringFactory:
@@ -15,16 +68,21 @@ class MonitoringFactory:
         self.supabase_config = supabase_config
         self.db_config = db_config
         self.current_monitor = None
+        self._active_method = None  # current_monitor를 만든 모니터링 방식
         
         # 설정 로드
         self.config = self._load_config()
         
     def _load_config(self) -> dict:
         """모니터링 설정 로드"""
-        config_file = Path("monitor_config.json")
+        config_file = CONFIG_PATH
         
-        if not config_file.exists():
-            # 기본 설정 반환
+        try:
+            stat = config_file.stat()
+        except OSError as e:
+            # 파일이 없거나 접근할 수 없으면 기본 설정 반환
+            if not isinstance(e, FileNotFoundError):
+                logging.warning(f"모니터링 설정 파일 확인 실패: {e}, 기본 설정 사용")
             return {
                 "monitoring": {
                     "method": "smart_polling",
@@ -33,8 +91,20 @@ class MonitoringFactory:
             }
             
         try:
-            with open(config_file, "r", encoding="utf-8") as f:
-                return json.load(f)
+            key = (str(config_file), stat.st_mtime_ns)
+            with _CONFIG_LOCK:
+                config = _CONFIG_CACHE.get(key)
+                if config is None:
+                    with open(config_file, "r", encoding="utf-8") as f:
+                        config = json.load(f)
+                    version = config.get("version", CONFIG_VERSION)
+                    if version != CONFIG_VERSION:
+                        logging.warning(f"지원하지 않는 모니터링 설정 버전: {version}, 기본 설정 사용")
+                        config = {"monitoring": {"method": "smart_polling"}}
+                    _CONFIG_CACHE.clear()
+                    _CONFIG_CACHE[key] = config
+            # 인스턴스별로 수정할 수 있도록 복사본 반환
+            return copy.deepcopy(config)
         except Exception as e:
             logging.error(f"모니터링 설정 로드 오류: {e}")
             return {"monitoring": {"method": "smart_polling"}}
@@ -67,51 +137,51 @@ class MonitoringFactory:
             
     def _create_hybrid_monitor(self):
         """하이브리드 모니터링 생성 (실시간 + 폴링)"""
-        class HybridMonitor:
-            def __init__(self, order_widget, supabase_config, db_config):
-                # 실시간 모니터 (주)
-                self.realtime_monitor = RealtimeOrderMonitor(order_widget, supabase_config)
-                # 폴링 모니터 (보조)
-                self.polling_monitor = SmartOrderMonitor(order_widget, supabase_config, db_config)
-                self.polling_monitor.monitor_thread.set_check_interval(60)  # 느린 폴링
-                
-            def start_monitoring(self):
-                self.realtime_monitor.start_monitoring()
-                self.polling_monitor.start_monitoring()
-                
-            def stop_monitoring(self):
-                self.realtime_monitor.stop_monitoring()
-                self.polling_monitor.stop_monitoring()
-                
-            def set_auto_print_mode(self, enabled: bool):
-                # 실시간 모니터는 자동 조정되므로 폴링만 조정
-                if enabled:
-                    self.polling_monitor.monitor_thread.set_check_interval(30)
-                else:
-                    self.polling_monitor.monitor_thread.set_check_interval(120)
-                    
         return HybridMonitor(self.order_widget, self.supabase_config, self.db_config)
         
+    def _save_config(self):
+        """모니터링 설정 저장 및 캐시 갱신 (임시 파일에 쓴 뒤 교체)"""
+        config_file = CONFIG_PATH
+        tmp_file = config_file.with_name(config_file.name + ".tmp")
+        try:
+            self.config["version"] = CONFIG_VERSION
+            with _CONFIG_LOCK:
+                with open(tmp_file, "w", encoding="utf-8") as f:
+                    json.dump(self.config, f, indent=2, ensure_ascii=False)
+                os.replace(tmp_file, config_file)
+                _CONFIG_CACHE.clear()
+                _CONFIG_CACHE[(str(config_file), config_file.stat().st_mtime_ns)] = copy.deepcopy(self.config)
+        except Exception as e:
+            logging.error(f"모니터링 설정 저장 오류: {e}")
+        
     def get_current_monitor(self):
         """현재 활성 모니터 반환"""
         if not self.current_monitor:
             self.current_monitor = self.create_monitor()
+            self._active_method = self.config.get("monitoring", {}).get("method", "smart_polling")
         return self.current_monitor
         
     def switch_monitoring_method(self, method: str):
         """모니터링 방식 변경"""
+        # 같은 방식으로 다시 요청된 경우 모니터를 재생성하지 않음
+        if self.current_monitor and method == self._active_method:
+            logging.debug(f"모니터링 방식 변경 생략 (이미 {method})")
+            return
+            
         # 기존 모니터 중지
         if self.current_monitor:
             try:
                 self.current_monitor.stop_monitoring()
-            except:
-                pass
+            except Exception:
+                logging.exception("기존 모니터 중지 오류")
                 
         # 설정 업데이트
-        self.config["monitoring"]["method"] = method
+        self.config.setdefault("monitoring", {})["method"] = method
+        self._save_config()
         
         # 새 모니터 생성 및 시작
         self.current_monitor = self.create_monitor()
+        self._active_method = method
         if self.current_monitor:
             self.current_monitor.start_monitoring()
             
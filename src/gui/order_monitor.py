@@ -1,15 +1,47 @@
 from PySide6.QtCore import QThread, Signal, QTimer, QMutex, QMutexLocker
 from PySide6.QtWidgets import QApplication
 import logging
-import time
-from datetime import datetime, timedelta
+import sqlite3
+import threading
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Any
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-from src.database.cache import SupabaseCache
+from src.database.cache import SupabaseCache, CONNECTION_PRAGMAS
 from src.printer.manager import PrinterManager
 from src.error_logger import get_error_logger
 
+# 최근 1시간 내의 미출력 주문 조회
+# created_at은 Supabase의 UTC ISO 문자열이므로 함수 없이 범위 비교 (인덱스 사용 가능)
+# (회사명은 _company_names 캐시에서 채움)
+_NEW_ORDERS_SQL = """
+SELECT o.order_id, o.company_id, o.is_dine_in, o.total_price, 
+       o.created_at, o.is_printed
+FROM "order" o
+WHERE o.created_at > ?
+AND o.is_printed = 0
+ORDER BY o.created_at DESC
+LIMIT 20
+"""
+
+# 자동출력이 꺼져 있을 때 사용하는 경량 조회 (알림용 ID만 필요)
+_NEW_ORDER_IDS_SQL = """
+SELECT o.order_id, o.created_at, o.is_printed
+FROM "order" o
+WHERE o.created_at > ?
+AND o.is_printed = 0
+ORDER BY o.created_at DESC
+LIMIT 20
+"""
+
+_COMPANY_NAMES_SQL = "SELECT company_id, company_name FROM company"
+
+_UPDATE_PRINT_STATUS_SQL = 'UPDATE "order" SET is_printed = ? WHERE order_id = ?'
+
 
 class OrderMonitorThread(QThread):
     """주문 모니터링을 위한 백그라운드 스레드"""
@@ -22,13 +54,44 @@ class OrderMonitorThread(QThread):
     
     def __init__(self, supabase_config, db_config):
         super().__init__()
-        self.cache = SupabaseCache(db_path=db_config['path'], supabase_config=supabase_config)
+        # Supabase 요청용 세션 (keep-alive로 매 폴링마다 TCP/TLS 연결을 새로 맺지 않음)
+        self._http = requests.Session()
+        self._http.mount("https://", HTTPAdapter(
+            pool_connections=4, pool_maxsize=8,
+            max_retries=Retry(total=2, backoff_factor=0.2)
+        ))
+        self._http.headers.update({"Connection": "keep-alive"})
+        
+        self.cache = SupabaseCache(db_path=db_config['path'], supabase_config=supabase_config, session=self._http)
+        self._http.headers.update(self.cache.headers)
         self.printer_manager = PrinterManager()
+        # 자동출력 활성화 상태 (사이클마다 조회하지 않고 set_auto_print_enabled로 갱신)
+        self._auto_print_enabled = self.printer_manager.is_auto_print_enabled()
         
         # 스레드 제어
         self._running = False
+        self._wake_event = threading.Event()  # 대기 중 즉시 깨우기 위한 신호 (중지 또는 새 주문 알림)
         self._mutex = QMutex()
         
+        # 모니터 스레드 전용 SQLite 연결 (run()에서 생성, 종료 시 닫음)
+        self._conn = None
+        
+        # company_id -> company_name 캐시 (테이블 동기화 후 갱신)
+        self._company_names = {}
+        
+        # 테이블 동기화 요청을 동시에 보내기 위한 스레드 풀 (start_monitoring마다 새로 생성)
+        self._sync_pool = None
+        
+        # Supabase 출력 상태 PATCH를 보내는 스레드 풀 (폴링 루프를 막지 않음)
+        self._last_conn_state = None  # 마지막으로 알린 연결 상태 (변경 시에만 시그널 발생)
+        self._remote_pool = None  # start_monitoring마다 새로 생성
+        # 원격 반영이 확인되지 않은 출력 완료 주문 (동기화로 is_printed가 되돌아가도 재출력 방지)
+        # order_id -> PATCH 성공 시점의 동기화 세대 (None이면 전송 중이거나 실패)
+        self._pending_printed = {}
+        self._failed_patch_ids = set()  # PATCH 실패로 다음 사이클에 다시 보낼 주문
+        self._sync_generation = 0  # 시작된 테이블 동기화 횟수
+        self._pending_lock = threading.Lock()
+        
         # 설정 가능한 파라미터
         self.check_interval = 10  # 기본 10초 간격
         self.fast_check_interval = 3  # 빠른 체크 간격 (새 주문 감지 시)
@@ -39,12 +102,44 @@ class OrderMonitorThread(QThread):
     def start_monitoring(self):
         """모니터링 시작"""
         self._running = True
+        self._wake_event.clear()
+        # 종료된 풀은 다시 쓸 수 없으므로 시작할 때마다 생성 (중지 후 재시작 지원)
+        self._sync_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="table-sync")
+        self._remote_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="supabase-patch")
         self.start()
         
     def stop_monitoring(self):
         """모니터링 중지"""
         self._running = False
+        self._wake_event.set()
         self.wait()  # 스레드 종료 대기
+        if self._sync_pool is not None:
+            # GUI 스레드를 막지 않도록 대기 없이 종료 (남은 요청은 취소)
+            self._sync_pool.shutdown(wait=False, cancel_futures=True)
+            self._sync_pool = None
+        if self._remote_pool is not None:
+            # 대기 중인 출력 상태 PATCH는 취소하지 않고 모두 보낸 뒤 세션을 닫음
+            # (취소하면 Supabase에 is_printed가 반영되지 않아 다음 동기화 후 재출력됨)
+            remote_pool, self._remote_pool = self._remote_pool, None
+            threading.Thread(
+                target=self._drain_remote_pool, args=(remote_pool,),
+                name="supabase-patch-drain", daemon=True
+            ).start()
+        else:
+            self._http.close()
+        
+    def _drain_remote_pool(self, remote_pool: ThreadPoolExecutor):
+        """남은 PATCH 전송이 끝날 때까지 기다린 뒤 HTTP 세션 닫기 (GUI 스레드를 막지 않음)"""
+        remote_pool.shutdown(wait=True)
+        self._http.close()
+        
+    def set_auto_print_enabled(self, enabled: bool):
+        """자동출력 활성화 상태 갱신 (GUI에서 토글 시 호출)"""
+        self._auto_print_enabled = enabled
+        
+    def wake_up(self):
+        """대기 중인 모니터링 루프를 깨워 즉시 주문 확인 (다른 스레드에서 호출 가능)"""
+        self._wake_event.set()
         
     def set_check_interval(self, interval: int):
         """체크 간격 설정"""
@@ -54,34 +149,84 @@ class OrderMonitorThread(QThread):
     def run(self):
         """메인 모니터링 루프"""
         logging.info("주문 모니터링 스레드 시작")
-        logging.info(f"자동출력 활성화 상태: {self.printer_manager.is_auto_print_enabled()}")
+        logging.info(f"자동출력 활성화 상태: {self._auto_print_enabled}")
         
         while self._running:
             try:
                 # 동적 간격 계산
                 current_interval = self._calculate_dynamic_interval()
-                logging.debug(f"모니터링 간격: {current_interval}초")
+                logging.debug("모니터링 간격: %s초", current_interval)
                 
                 # 주문 확인 및 처리
                 self._check_and_process_orders()
                 
-                # 다음 체크까지 대기 (중간에 중지 신호 확인)
-                for _ in range(current_interval):
-                    if not self._running:
-                        break
-                    time.sleep(1)
+                # 다음 체크까지 대기 (중지 신호나 새 주문 알림이 오면 즉시 깨어남)
+                self._wake_event.wait(current_interval)
+                self._wake_event.clear()
                     
             except Exception as e:
                 logging.error(f"주문 모니터링 중 오류: {e}")
-                time.sleep(5)  # 오류 시 5초 대기
+                self._wake_event.wait(5)  # 오류 시 5초 대기
                 
+        self._close_conn()
         logging.info("주문 모니터링 스레드 종료")
         
+    def _get_conn(self) -> sqlite3.Connection:
+        """모니터 스레드에서 재사용하는 SQLite 연결 반환"""
+        if self._conn is None:
+            conn = sqlite3.connect(self.cache.db_path, check_same_thread=False, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            try:
+                conn.execute("PRAGMA journal_mode=WAL")
+            except sqlite3.Error as e:
+                logging.warning(f"WAL 모드 설정 실패: {e}")
+            # 캐시 DB 공통 설정 (synchronous=NORMAL, 메모리 임시 저장소, 페이지 캐시, mmap)
+            for pragma in CONNECTION_PRAGMAS:
+                conn.execute(pragma)
+            self._conn = conn
+            self._log_query_plan()
+            self._load_company_names()
+        return self._conn
+        
+    def _load_company_names(self):
+        """회사명 캐시 갱신"""
+        try:
+            self._company_names = dict(self._get_conn().execute(_COMPANY_NAMES_SQL).fetchall())
+        except sqlite3.Error as e:
+            logging.warning(f"회사명 캐시 갱신 실패: {e}")
+            
+    def _company_name(self, company_id) -> str:
+        """회사명 조회 (캐시에 없으면 다시 읽음)"""
+        name = self._company_names.get(company_id)
+        if name is None:
+            self._load_company_names()
+            name = self._company_names.get(company_id, "N/A")
+        return name
+        
+    def _log_query_plan(self):
+        """새 주문 조회 쿼리의 실행 계획을 한 번 기록 (인덱스 사용 확인용)"""
+        try:
+            plan = self._conn.execute("EXPLAIN QUERY PLAN " + _NEW_ORDERS_SQL, ("",)).fetchall()
+            logging.debug("새 주문 조회 실행 계획: " + "; ".join(row[-1] for row in plan))
+        except sqlite3.Error as e:
+            logging.debug("실행 계획 조회 실패: %s", e)
+        
+    def _close_conn(self):
+        """SQLite 연결 닫기"""
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except sqlite3.Error as e:
+                logging.warning(f"SQLite 연결 종료 오류: {e}")
+            self._conn = None
+        # 테이블 동기화에 쓰던 캐시의 공유 연결도 닫음
+        self.cache.close()
+        
     def _calculate_dynamic_interval(self) -> int:
         """동적 체크 간격 계산"""
         # 자동출력이 활성화된 경우 더 자주 체크
-        auto_print_enabled = self.printer_manager.is_auto_print_enabled()
-        logging.debug(f"자동출력 활성화 상태 체크: {auto_print_enabled}")
+        auto_print_enabled = self._auto_print_enabled
+        logging.debug("자동출력 활성화 상태 체크: %s", auto_print_enabled)
         
         if auto_print_enabled:
             base_interval = self.fast_check_interval
@@ -101,104 +246,107 @@ class OrderMonitorThread(QThread):
         try:
             logging.debug("주문 확인 및 처리 시작")
             
-            # 1. 연결 상태 확인
-            connection_ok = self._check_connection()
-            logging.debug(f"연결 상태: {connection_ok}")
-            self.connection_status_changed.emit(connection_ok)
+            # 1. 주문 데이터 동기화 (경량화) - 응답 여부로 연결 상태도 판단
+            logging.debug("필수 테이블 동기화 시작")
+            connection_ok = self._sync_essential_tables()
+            logging.debug("연결 상태: %s", connection_ok)
+            self._set_connection_state(connection_ok)
             
             if not connection_ok:
                 logging.warning("연결 상태 불량으로 처리 중단")
                 return
                 
-            # 2. 주문 데이터 동기화 (경량화)
-            logging.debug("필수 테이블 동기화 시작")
-            self._sync_essential_tables()
+            # 실패했던 출력 상태 PATCH 재전송
+            self._retry_failed_patches()
             
-            # 3. 새로운 주문 확인
+            # 2. 새로운 주문 확인 (자동출력이 꺼져 있으면 요약 정보만 조회)
+            auto_print_enabled = self._auto_print_enabled
             logging.debug("새로운 주문 조회 시작")
-            new_orders = self._get_new_orders()
-            logging.info(f"조회된 미출력 주문: {len(new_orders)}개")
+            new_orders = self._get_new_orders(with_details=auto_print_enabled)
+            logging.debug("조회된 미출력 주문: %s개", len(new_orders))
             
             if new_orders:
                 logging.info("새로운 주문이 발견되었습니다:")
                 for order in new_orders:
-                    logging.info(f"  주문ID: {order.get('order_id')}, 회사: {order.get('company_name')}, 출력상태: {order.get('is_printed')}")
+                    logging.info(f"  주문ID: {order.get('order_id')}, 회사: {order.get('company_name', '-')}, 출력상태: {order.get('is_printed')}")
                 
                 self.consecutive_empty_checks = 0
                 self.last_order_time = datetime.now()
                 self.new_orders_found.emit(new_orders)
                 
-                # 4. 자동출력 처리 (별도 처리)
-                auto_print_enabled = self.printer_manager.is_auto_print_enabled()
-                logging.info(f"자동출력 활성화 상태: {auto_print_enabled}")
+                # 3. 자동출력 처리 (별도 처리)
+                logging.debug("자동출력 활성화 상태: %s", auto_print_enabled)
                 
                 if auto_print_enabled:
                     logging.info(f"{len(new_orders)}개 주문에 대해 자동출력 처리 시작")
                     self._process_auto_print_orders(new_orders)
                 else:
-                    logging.info("자동출력이 비활성화되어 있어 처리하지 않음")
+                    logging.debug("자동출력이 비활성화되어 있어 처리하지 않음")
             else:
                 self.consecutive_empty_checks += 1
-                logging.debug(f"미출력 주문 없음 (연속 빈 체크: {self.consecutive_empty_checks}회)")
+                logging.debug("미출력 주문 없음 (연속 빈 체크: %s회)", self.consecutive_empty_checks)
                 
         except Exception as e:
             logging.error(f"주문 처리 중 오류: {e}")
-            import traceback
             logging.error(f"상세 오류: {traceback.format_exc()}")
             
-    def _check_connection(self) -> bool:
-        """네트워크 연결 상태 확인"""
-        try:
-            if not self.cache.base_url:
-                return False
-                
-            response = requests.get(
-                f"{self.cache.base_url}/rest/v1/company",
-                headers=self.cache.headers,
-                timeout=5,
-                params={"select": "company_id", "limit": "1"}
-            )
-            return response.status_code == 200
-        except:
-            return False
+    def _set_connection_state(self, connected: bool):
+        """연결 상태가 바뀐 경우에만 시그널 발생"""
+        if connected != self._last_conn_state:
+            self._last_conn_state = connected
+            self.connection_status_changed.emit(connected)
             
-    def _sync_essential_tables(self):
-        """필수 테이블만 동기화 (성능 최적화)"""
+    def _sync_essential_tables(self) -> bool:
+        """필수 테이블만 동기화 (성능 최적화). 하나라도 응답을 받으면 True"""
         essential_tables = ["order", "order_item", "order_item_option", "company", "menu_item", "option_item"]
-        for table in essential_tables:
-            try:
-                self.cache.fetch_and_store_table(table)
-            except Exception as e:
-                logging.warning(f"테이블 {table} 동기화 실패: {e}")
-                
-    def _get_new_orders(self) -> List[Dict[str, Any]]:
-        """새로운 주문 조회 (최적화된 쿼리)"""
-        import sqlite3
-        
-        conn = sqlite3.connect(self.cache.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+        with self._pending_lock:
+            self._sync_generation += 1
+            generation = self._sync_generation
+        # 네트워크 대기가 대부분이므로 병렬로 요청 (세션의 연결 풀 공유), 저장은 한 트랜잭션
+        results = self.cache.fetch_and_store_tables(essential_tables, executor=self._sync_pool)
+        self._load_company_names()
+        if results.get("order"):
+            self._release_pending_printed(generation)
+        return any(results.values())
         
-        # 최근 1시간 내의 미출력 주문만 조회
-        query = """
-        SELECT o.order_id, o.company_id, o.is_dine_in, o.total_price, 
-               o.created_at, o.is_printed, c.company_name
-        FROM "order" o
-        JOIN company c ON c.company_id = o.company_id
-        WHERE o.is_printed = 0 
-        AND datetime(o.created_at) > datetime('now', '-1 hour')
-        ORDER BY o.created_at DESC
-        LIMIT 20
-        """
-        
-        rows = cursor.execute(query).fetchall()
-        conn.close()
-        return [dict(row) for row in rows]
+    def _release_pending_printed(self, generation: int):
+        """PATCH 성공 이후에 시작된 동기화가 저장되었으면 해당 주문을 대기 목록에서 제거"""
+        with self._pending_lock:
+            synced = [order_id for order_id, patched_at in self._pending_printed.items()
+                      if patched_at is not None and patched_at < generation]
+            for order_id in synced:
+                del self._pending_printed[order_id]
+                
+    def _get_new_orders(self, with_details: bool = True) -> List[Dict[str, Any]]:
+        """새로운 주문 조회 (최적화된 쿼리). with_details가 False면 ID/시각만 조회"""
+        cutoff = (datetime.now(timezone.utc) - timedelta(hours=1)).strftime('%Y-%m-%dT%H:%M:%S')
+        sql = _NEW_ORDERS_SQL if with_details else _NEW_ORDER_IDS_SQL
+        rows = self._get_conn().execute(sql, (cutoff,)).fetchall()
+        orders = [dict(row) for row in rows]
+        with self._pending_lock:
+            if self._pending_printed:
+                orders = [o for o in orders if o["order_id"] not in self._pending_printed]
+        if with_details:
+            for order in orders:
+                order["company_name"] = self._company_name(order["company_id"])
+        return orders
         
     def _process_auto_print_orders(self, orders: List[Dict[str, Any]]):
         """자동출력 처리 (비동기)"""
-        logging.info(f"자동출력 처리 시작: {len(orders)}개 주문")
+        logging.debug("자동출력 처리 시작: %s개 주문", len(orders))
         
+        printed_ids = []  # 출력에 성공한 주문 (루프 후 한 번에 상태 업데이트)
+        try:
+            # 모든 주문의 상세 정보를 한 번의 조인 쿼리로 조회
+            details = self.cache.join_order_details([order.get("order_id") for order in orders])
+            self._print_orders(orders, details, printed_ids)
+        finally:
+            if printed_ids:
+                self._update_print_statuses(printed_ids, True)
+                
+    def _print_orders(self, orders: List[Dict[str, Any]], details: Dict[int, Dict[str, Any]],
+                      printed_ids: List[int]):
+        """주문들을 순서대로 출력하고 성공한 주문 ID를 printed_ids에 추가"""
         for order in orders:
             if not self._running:
                 logging.info("모니터링 중지로 자동출력 처리 중단")
@@ -206,35 +354,35 @@ class OrderMonitorThread(QThread):
                 
             try:
                 order_id = order.get("order_id")
-                logging.info(f"주문 {order_id} 자동출력 처리 시작")
+                logging.debug("주문 %s 자동출력 처리 시작", order_id)
                 
                 # 프린터 상태 확인
                 printer_status_ok = self.printer_manager.check_printer_status()
-                logging.info(f"주문 {order_id}: 프린터 상태 = {printer_status_ok}")
+                logging.debug("주문 %s: 프린터 상태 = %s", order_id, printer_status_ok)
                 
                 if not printer_status_ok:
                     logging.warning(f"주문 {order_id}: 프린터 상태 불량으로 건너뜀")
                     continue
                 
                 # 주문 상세 정보 가져오기
-                logging.debug(f"주문 {order_id}: 상세 정보 조회 중")
-                order_detail = self.cache.join_order_detail(order_id)
+                logging.debug("주문 %s: 상세 정보 조회 중", order_id)
+                order_detail = details.get(order_id)
                 
                 if not order_detail:
                     logging.warning(f"주문 {order_id}: 상세 정보 조회 실패")
                     continue
                 
-                logging.info(f"주문 {order_id}: 상세 정보 조회 성공, 아이템 {len(order_detail.get('items', []))}개")
+                logging.debug("주문 %s: 상세 정보 조회 성공, 아이템 %s개", order_id, len(order_detail.get('items', [])))
                     
                 # 자동출력 실행
-                logging.info(f"주문 {order_id}: 자동출력 실행 시작")
+                logging.debug("주문 %s: 자동출력 실행 시작", order_id)
                 success = self._execute_auto_print(order_detail)
                 
                 if success:
                     logging.info(f"주문 {order_id}: 자동출력 성공")
                     self.auto_print_completed.emit(order_id, True)
-                    # 출력 상태 업데이트
-                    self._update_print_status(order_id, True)
+                    # 출력 상태 업데이트 대상에 추가
+                    printed_ids.append(order_id)
                 else:
                     logging.error(f"주문 {order_id}: 자동출력 실패")
                     self.auto_print_failed.emit(order_id, "출력 실패")
@@ -242,7 +390,6 @@ class OrderMonitorThread(QThread):
             except Exception as e:
                 order_id = order.get('order_id', 'Unknown')
                 logging.error(f"주문 {order_id} 자동출력 중 예외 발생: {e}")
-                import traceback
                 logging.error(f"상세 오류: {traceback.format_exc()}")
                 self.auto_print_failed.emit(order_id, str(e))
                 
@@ -250,42 +397,36 @@ class OrderMonitorThread(QThread):
         """실제 프린터 출력 실행"""
         try:
             order_id = order_data.get("order_id", "N/A")
-            logging.info(f"주문 {order_id}: 프린터 출력 실행 시작")
+            logging.debug("주문 %s: 프린터 출력 실행 시작", order_id)
             
-            # 주문 데이터 포맷팅
-            formatted_order = {
-                "order_id": str(order_data.get("order_id", "N/A")),
-                "company_name": order_data.get("company_name", "N/A"),
-                "created_at": order_data.get("created_at", ""),
-                "is_dine_in": order_data.get("is_dine_in", True),
-                "total_price": order_data.get("total_price", 0),  # 데이터베이스의 total_price 포함
-                "items": []
-            }
+            # 주문 데이터 포맷팅 (join_order_detail이 매번 새로 만든 dict이므로 복사 없이 기본값만 채움)
+            formatted_order = order_data
+            formatted_order["order_id"] = str(order_data.get("order_id", "N/A"))
+            formatted_order.setdefault("company_name", "N/A")
+            formatted_order.setdefault("created_at", "")
+            formatted_order.setdefault("is_dine_in", True)
+            formatted_order.setdefault("total_price", 0)  # 데이터베이스의 total_price 포함
             
             # 주문 항목 처리
-            for item in order_data.get("items", []):
-                formatted_item = {
-                    "order_item_id": item.get("order_item_id"),
-                    "name": item.get("name", "N/A"),
-                    "quantity": item.get("quantity", 1),
-                    "price": item.get("price", 0),
-                    "options": item.get("options", [])
-                }
-                formatted_order["items"].append(formatted_item)
+            for item in formatted_order.setdefault("items", []):
+                item.setdefault("name", "N/A")
+                item.setdefault("quantity", 1)
+                item.setdefault("price", 0)
+                item.setdefault("options", [])
                 
                 # 옵션 정보 로깅 추가
                 options = item.get("options", [])
                 if options:
-                    logging.info(f"주문 {order_id}: 아이템 '{item.get('name')}' 옵션 {len(options)}개 포함")
+                    logging.debug("주문 %s: 아이템 '%s' 옵션 %s개 포함", order_id, item.get('name'), len(options))
                     for opt in options:
-                        logging.debug(f"  옵션: {opt.get('name')} x{opt.get('quantity', 1)} = {opt.get('total_price', 0)}원")
+                        logging.debug("  옵션: %s x%s = %s원", opt.get('name'), opt.get('quantity', 1), opt.get('total_price', 0))
                 else:
-                    logging.debug(f"주문 {order_id}: 아이템 '{item.get('name')}' 옵션 없음")
+                    logging.debug("주문 %s: 아이템 '%s' 옵션 없음", order_id, item.get('name'))
             
-            logging.info(f"주문 {order_id}: 포맷팅 완료, 아이템 {len(formatted_order['items'])}개")
+            logging.debug("주문 %s: 포맷팅 완료, 아이템 %s개", order_id, len(formatted_order['items']))
             
             # 양쪽 프린터 출력
-            logging.info(f"주문 {order_id}: 프린터 출력 시작")
+            logging.debug("주문 %s: 프린터 출력 시작", order_id)
             results = self.printer_manager.print_both_receipts(formatted_order)
             
             customer_success = results.get("customer", False)
@@ -306,39 +447,84 @@ class OrderMonitorThread(QThread):
         except Exception as e:
             order_id = order_data.get("order_id", "N/A")
             logging.error(f"주문 {order_id}: 프린터 출력 중 예외 발생: {e}")
-            import traceback
             logging.error(f"상세 오류: {traceback.format_exc()}")
             return False
             
     def _update_print_status(self, order_id: int, is_printed: bool):
         """출력 상태 업데이트"""
+        self._update_print_statuses([order_id], is_printed)
+        
+    def _update_print_statuses(self, order_ids: List[int], is_printed: bool):
+        """여러 주문의 출력 상태를 한 번에 업데이트 (로컬 트랜잭션 1회 + Supabase PATCH 1회)"""
         try:
-            import sqlite3
-            
-            # 로컬 DB 업데이트
-            with sqlite3.connect(self.cache.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    'UPDATE "order" SET is_printed = ? WHERE order_id = ?',
-                    (1 if is_printed else 0, order_id)
+            # 로컬 DB 업데이트 (하나의 트랜잭션)
+            conn = self._get_conn()
+            value = 1 if is_printed else 0
+            conn.execute("BEGIN")
+            try:
+                conn.executemany(
+                    _UPDATE_PRINT_STATUS_SQL,
+                    [(value, order_id) for order_id in order_ids]
                 )
-                conn.commit()
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
             
-            # Supabase 업데이트 (비동기)
+            # Supabase 업데이트 (in 필터로 한 번에, 백그라운드에서 전송)
             if self.cache.base_url:
-                try:
-                    requests.patch(
-                        f"{self.cache.base_url}/rest/v1/order",
-                        headers=self.cache.headers,
-                        json={"is_printed": is_printed},
-                        params={"order_id": f"eq.{order_id}"},
-                        timeout=10
-                    )
-                except Exception as e:
-                    logging.error(f"Supabase 업데이트 실패: {e}")
+                self._submit_print_patch(list(order_ids), is_printed)
                     
         except Exception as e:
             logging.error(f"출력 상태 업데이트 오류: {e}")
+            
+    def _submit_print_patch(self, order_ids: List[int], is_printed: bool):
+        """출력 상태 PATCH를 원격 스레드 풀에 제출"""
+        if is_printed:
+            with self._pending_lock:
+                self._pending_printed.update(dict.fromkeys(order_ids))
+                if self._remote_pool is None:
+                    # 모니터링이 중지된 상태면 다음 시작 때 재전송
+                    self._failed_patch_ids.update(order_ids)
+                    return
+        elif self._remote_pool is None:
+            return
+        future = self._remote_pool.submit(self._patch_print_status, order_ids, is_printed)
+        future.add_done_callback(lambda f: self._on_patch_done(f, order_ids, is_printed))
+        
+    def _retry_failed_patches(self):
+        """실패한 출력 완료 PATCH를 한 번에 다시 전송"""
+        with self._pending_lock:
+            order_ids = sorted(self._failed_patch_ids)
+            self._failed_patch_ids.clear()
+        if order_ids:
+            logging.info(f"Supabase 출력 상태 재전송: 주문 {order_ids}")
+            self._submit_print_patch(order_ids, True)
+            
+    def _patch_print_status(self, order_ids: List[int], is_printed: bool):
+        """Supabase에 출력 상태 PATCH 전송 (원격 스레드 풀에서 실행)"""
+        response = self._http.patch(
+            f"{self.cache.base_url}/rest/v1/order",
+            json={"is_printed": is_printed},
+            params={"order_id": f"in.({','.join(map(str, order_ids))})"},
+            timeout=10
+        )
+        response.raise_for_status()
+        
+    def _on_patch_done(self, future, order_ids: List[int], is_printed: bool):
+        """PATCH 완료 처리 (성공 시 현재 동기화 세대 기록, 실패 시 재전송 대상에 추가)"""
+        error = "전송 취소됨" if future.cancelled() else future.exception()
+        if error:
+            logging.error(f"Supabase 업데이트 실패 (주문 {order_ids}): {error}")
+        if not is_printed:
+            return
+        with self._pending_lock:
+            if error:
+                self._failed_patch_ids.update(order_ids)
+            else:
+                # 이 시점 이후에 시작된 동기화가 저장되어야 대기 목록에서 제거
+                for order_id in order_ids:
+                    self._pending_printed[order_id] = self._sync_generation
 
 
 class SmartOrderMonitor:
@@ -371,6 +557,7 @@ class SmartOrderMonitor:
             
     def set_auto_print_mode(self, enabled: bool):
         """자동출력 모드 설정"""
+        self.monitor_thread.set_auto_print_enabled(enabled)
         if enabled:
             self.monitor_thread.set_check_interval(3)  # 빠른 체크
         else:
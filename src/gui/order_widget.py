@@ -15,7 +15,11 @@ from PySide6.QtCore import Qt, Slot, QTimer
 import logging
 import sqlite3
 import requests
-from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
+import functools
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Any
 
 # Use an absolute import so this module works when executed directly.
@@ -25,14 +29,167 @@ from src.error_logger import get_error_logger
 from src.printer.manager import PrinterManager
 from src.gui.monitoring_factory import create_optimized_order_monitor
 
+# 자주 실행되는 SQL (같은 문자열을 재사용하면 sqlite3 문장 캐시에서 컴파일 결과를 재사용)
+_SQL_UNPRINTED_ORDERS = """
+SELECT o.order_id, o.company_id, o.is_dine_in, o.total_price, o.created_at,
+       c.company_name
+FROM "order" o
+JOIN company c ON c.company_id = o.company_id
+WHERE o.is_printed = 0
+ORDER BY o.created_at DESC
+LIMIT 10
+"""
+
+# 주문 화면이 매번 동기화하는 테이블
+_ORDER_TABLES = ["order", "order_item", "order_item_option"]
+
+@functools.lru_cache(maxsize=128)
+def _update_order_sql(columns: tuple, count: int) -> str:
+    """주어진 컬럼들을 주문 count개에 대해 한 번에 바꾸는 UPDATE 문 (조합마다 같은 문자열을 재사용)"""
+    assignments = ", ".join(f"{column} = ?" for column in columns)
+    placeholders = ",".join(["?"] * count)
+    return f'UPDATE "order" SET {assignments} WHERE order_id IN ({placeholders})'
+
+
+# 한국 표준시 (서머타임이 없으므로 고정 오프셋 사용, tzdata 불필요)
+_SEOUL_TZ = timezone(timedelta(hours=9), "KST")
+
+
+@functools.lru_cache(maxsize=2048)
+def _format_created_at(created_at: str) -> str:
+    """ISO 형식의 주문일시를 한국 시간(KST) 문자열로 변환"""
+    try:
+        dt = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return dt.astimezone(_SEOUL_TZ).strftime("%Y-%m-%d %H:%M:%S")
+    except Exception:
+        return created_at
+
+
+@functools.lru_cache(maxsize=4096)
+def _format_price(price) -> str:
+    """총액 표시 문자열 (예: 12,000원)"""
+    return f"{price:,}원"
+
+
 class OrderWidget(QWidget):
+    # 위젯 스타일시트 (한 번만 파싱되도록 버튼별 인라인 스타일 없이 objectName 선택자로 통합)
+    _WIDGET_QSS = """
+        QTableWidget {
+            background-color: white;
+            border: 1px solid #ddd;
+        }
+        QTableWidget::item {
+            padding: 5px;
+        }
+        QPushButton {
+            background-color: #4CAF50;
+            color: white;
+            border: none;
+            padding: 8px 16px;
+            border-radius: 4px;
+        }
+        QPushButton:hover {
+            background-color: #45a049;
+        }
+        QPushButton:disabled {
+            background-color: #cccccc;
+        }
+        QProgressBar {
+            border: 1px solid #ddd;
+            border-radius: 4px;
+            text-align: center;
+        }
+        QProgressBar::chunk {
+            background-color: #4CAF50;
+        }
+        QCheckBox {
+            font-weight: bold;
+            color: #2E7D32;
+        }
+        QComboBox {
+            background-color: white;
+            border: 1px solid #ccc;
+            border-radius: 3px;
+            padding: 3px 5px;
+            min-width: 80px;
+        }
+        QComboBox:hover {
+            border: 1px solid #007BFF;
+        }
+        QComboBox::drop-down {
+            subcontrol-origin: padding;
+            subcontrol-position: top right;
+            width: 20px;
+            border-left-width: 1px;
+            border-left-color: #ccc;
+            border-left-style: solid;
+        }
+        QComboBox::down-arrow {
+            image: none;
+            border: 2px solid #666;
+            width: 6px;
+            height: 6px;
+            border-top: none;
+            border-right: none;
+            transform: rotate(-45deg);
+        }
+        QLabel#orderTitleLabel {
+            font-size: 18px;
+            font-weight: bold;
+        }
+        QPushButton#printBothButton {
+            background-color: #007BFF;
+            color: white;
+            border: none;
+            padding: 8px 16px;
+            border-radius: 4px;
+            font-weight: bold;
+        }
+        QPushButton#printBothButton:hover {
+            background-color: #0056b3;
+        }
+        QPushButton#printBothButton:pressed {
+            background-color: #004085;
+        }
+        QPushButton#cancelOrderButton {
+            background-color: #DC143C;
+            color: white;
+            border: none;
+            padding: 8px 16px;
+            border-radius: 4px;
+            font-weight: bold;
+        }
+        QPushButton#cancelOrderButton:hover {
+            background-color: #B22222;
+        }
+        QPushButton#cancelOrderButton:pressed {
+            background-color: #8B0000;
+        }
+    """
+
     def __init__(self, supabase_config, db_config):
         super().__init__()
         self.printer_manager = PrinterManager()
-        self.cache = SupabaseCache(db_path=db_config['path'], supabase_config=supabase_config)
+        # Supabase 요청용 세션 (keep-alive로 상태 PATCH마다 TCP/TLS 연결을 새로 맺지 않음)
+        self._http = requests.Session()
+        self._http.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+        self._http.headers.update({"Connection": "keep-alive"})
+        
+        self.cache = SupabaseCache(db_path=db_config['path'], supabase_config=supabase_config, session=self._http)
+        self._http.headers.update(self.cache.headers)
         self.cache.setup_sqlite()
+        
+        # Supabase 상태 PATCH는 UI 스레드를 막지 않도록 작업 스레드에서 전송
+        self._http_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="order-patch")
+        # 테이블 다운로드 전용 풀 (재시도하는 PATCH 뒤에 줄 서서 새로고침이 멈추지 않도록 분리)
+        self._sync_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="order-sync")
+        
         self.setup_ui()
         self.orders = []
+        self._render_keys = []  # 마지막으로 그린 주문 목록의 행별 키
+        self._loading_state = None  # 마지막으로 적용한 로딩 상태
 
         # 최적화된 모니터링 시스템 생성
         self.order_monitor = create_optimized_order_monitor(self, supabase_config, db_config)
@@ -41,6 +198,12 @@ class OrderWidget(QWidget):
         self.message_timer = QTimer()
         self.message_timer.setSingleShot(True)
         self.message_timer.timeout.connect(self.clear_temporary_message)
+        
+        # 자동 출력 체크박스 변경 적용 타이머 (연속 변경은 마지막 값만 한 번 적용)
+        self._pending_auto_print = None
+        self._auto_print_timer = QTimer()
+        self._auto_print_timer.setSingleShot(True)
+        self._auto_print_timer.timeout.connect(self._apply_auto_print)
 
         # 초기 주문 로드
         self.refresh_orders()
@@ -59,7 +222,7 @@ class OrderWidget(QWidget):
         # 상단 레이아웃 (제목 + 버튼)
         top_layout = QHBoxLayout()
         title_label = QLabel("식권 주문 현황")
-        title_label.setStyleSheet("font-size: 18px; font-weight: bold;")
+        title_label.setObjectName("orderTitleLabel")
         top_layout.addWidget(title_label)
         
         # 자동 출력 체크박스 추가
@@ -92,22 +255,7 @@ class OrderWidget(QWidget):
 
         self.print_both_btn = QPushButton("동시 출력")
         self.print_both_btn.clicked.connect(self.print_both_receipts)
-        self.print_both_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #007BFF;
-                color: white;
-                border: none;
-                padding: 8px 16px;
-                border-radius: 4px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #0056b3;
-            }
-            QPushButton:pressed {
-                background-color: #004085;
-            }
-        """)
+        self.print_both_btn.setObjectName("printBothButton")
         top_layout.addWidget(self.print_both_btn)
 
 
@@ -115,22 +263,7 @@ class OrderWidget(QWidget):
         # 주문취소 버튼 추가
         self.cancel_order_btn = QPushButton("주문취소")
         self.cancel_order_btn.clicked.connect(self.cancel_order)
-        self.cancel_order_btn.setStyleSheet("""
-            QPushButton {
-                background-color: #DC143C;
-                color: white;
-                border: none;
-                padding: 8px 16px;
-                border-radius: 4px;
-                font-weight: bold;
-            }
-            QPushButton:hover {
-                background-color: #B22222;
-            }
-            QPushButton:pressed {
-                background-color: #8B0000;
-            }
-        """)
+        self.cancel_order_btn.setObjectName("cancelOrderButton")
         top_layout.addWidget(self.cancel_order_btn)
         
         layout.addLayout(top_layout)
@@ -159,111 +292,50 @@ class OrderWidget(QWidget):
         self.notice_label = QLabel("")
         layout.addWidget(self.notice_label)
         
-        # 스타일 설정
-        self.setStyleSheet("""
-            QTableWidget {
-                background-color: white;
-                border: 1px solid #ddd;
-            }
-            QTableWidget::item {
-                padding: 5px;
-            }
-            QPushButton {
-                background-color: #4CAF50;
-                color: white;
-                border: none;
-                padding: 8px 16px;
-                border-radius: 4px;
-            }
-            QPushButton:hover {
-                background-color: #45a049;
-            }
-            QPushButton:disabled {
-                background-color: #cccccc;
-            }
-            QProgressBar {
-                border: 1px solid #ddd;
-                border-radius: 4px;
-                text-align: center;
-            }
-            QProgressBar::chunk {
-                background-color: #4CAF50;
-            }
-            QCheckBox {
-                font-weight: bold;
-                color: #2E7D32;
-            }
-            QComboBox {
-                background-color: white;
-                border: 1px solid #ccc;
-                border-radius: 3px;
-                padding: 3px 5px;
-                min-width: 80px;
-            }
-            QComboBox:hover {
-                border: 1px solid #007BFF;
-            }
-            QComboBox::drop-down {
-                subcontrol-origin: padding;
-                subcontrol-position: top right;
-                width: 20px;
-                border-left-width: 1px;
-                border-left-color: #ccc;
-                border-left-style: solid;
-            }
-            QComboBox::down-arrow {
-                image: none;
-                border: 2px solid #666;
-                width: 6px;
-                height: 6px;
-                border-top: none;
-                border-right: none;
-                transform: rotate(-45deg);
-            }
-        """)
+        # 스타일 설정 (위젯 전체에 한 번만 적용)
+        self.setStyleSheet(self._WIDGET_QSS)
     
     @Slot()
     def toggle_auto_print(self, state):
         """자동 출력 기능을 토글합니다."""
         # PySide6에서는 Qt.Checked.value와 비교해야 함
         enabled = state == Qt.Checked.value
-        logging.info(f"자동 출력 체크박스 상태 변경: state={state}, enabled={enabled}")
+        logging.debug("자동 출력 체크박스 상태 변경: state=%s, enabled=%s", state, enabled)
+        
+        # 실제 적용은 150ms 동안 추가 변경이 없을 때 한 번만
+        self._pending_auto_print = enabled
+        self._auto_print_timer.start(150)
+
+    def _apply_auto_print(self):
+        """마지막으로 선택된 자동 출력 상태를 설정과 모니터에 반영합니다."""
+        enabled = self._pending_auto_print
+        self._pending_auto_print = None
+        if enabled is None:
+            return
         
         try:
             # 현재 설정 가져오기
             config = self.printer_manager.get_auto_print_config()
-            logging.info(f"변경 전 설정: {config}")
             
-            # 설정 업데이트
+            # 설정 업데이트 (빠르게 껐다 켜서 원래 값으로 돌아왔으면 할 일 없음)
             old_enabled = config.get("enabled", False)
+            if old_enabled == enabled:
+                return
             config["enabled"] = enabled
-            logging.info(f"설정 변경: {old_enabled} -> {enabled}")
+            logging.info(f"자동 출력 설정 변경: {old_enabled} -> {enabled}")
             
             save_success = self.printer_manager.set_auto_print_config(config)
-            logging.info(f"설정 저장 결과: {save_success}")
+            if not save_success:
+                logging.warning("자동 출력 설정 저장 실패")
             
             # 모니터링 시스템의 자동출력 모드 조정
             if hasattr(self.order_monitor, 'set_auto_print_mode'):
                 self.order_monitor.set_auto_print_mode(enabled)
             
-            # 설정 저장 후 다시 확인
-            updated_config = self.printer_manager.get_auto_print_config()
-            logging.info(f"변경 후 설정: {updated_config}")
-            
-            # 파일에서도 직접 확인
-            try:
-                import json
-                with open("printer_config.json", "r", encoding="utf-8") as f:
-                    file_config = json.load(f)
-                logging.info(f"파일에서 읽은 auto_print 설정: {file_config.get('auto_print', {})}")
-            except Exception as file_e:
-                logging.error(f"파일 읽기 오류: {file_e}")
-            
             status = "활성화" if enabled else "비활성화"
             message = f"자동 출력이 {status}되었습니다."
             
-            # 메시지 표시 및 로깅
-            logging.info(f"메시지 표시: {message}")
+            # 메시지 표시
             self.show_temporary_message(message, 3000)
             
         except Exception as e:
@@ -275,6 +347,11 @@ class OrderWidget(QWidget):
     
     def set_loading_state(self, is_loading):
         """로딩 상태에 따라 UI 요소들을 업데이트합니다."""
+        # 상태가 그대로면 위젯 활성화/스타일 재계산 생략
+        if is_loading == self._loading_state:
+            return
+        self._loading_state = is_loading
+        
         self.refresh_btn.setEnabled(not is_loading)
         self.sync_btn.setEnabled(not is_loading)
         self.print_customer_btn.setEnabled(not is_loading)
@@ -289,86 +366,68 @@ class OrderWidget(QWidget):
             self.progress_bar.setValue(100)
     
     def update_order_status(self, order_id: int, is_printed: bool):
-        """주문의 출력 상태를 업데이트합니다 (로컬 DB + Supabase 양방향 동기화)."""
-        local_success = False
-        supabase_success = False
-        
+        """주문의 출력 상태와 마지막 출력 시도 시각을 업데이트합니다 (로컬 DB + Supabase 양방향 동기화)."""
+        fields = {"is_printed": is_printed, "last_print_attempt": datetime.now().isoformat()}
+        return self._update_order_fields([order_id], fields)
+
+    def _update_order_fields(self, order_ids: List[int], fields: Dict[str, Any]) -> bool:
+        """주문들의 컬럼을 로컬 DB에 한 트랜잭션으로 쓰고 Supabase에는 백그라운드로 반영합니다."""
+        if not order_ids:
+            return True
         try:
             # 1. 로컬 SQLite 업데이트
-            with sqlite3.connect(self.cache.db_path) as conn:
-                cursor = conn.cursor()
-                
-                # 현재 시간
-                now = datetime.now().isoformat()
-                
-                # is_printed 상태 업데이트
-                cursor.execute(
-                    'UPDATE "order" SET is_printed = ?, last_print_attempt = ? WHERE order_id = ?',
-                    (1 if is_printed else 0, now, order_id)
-                )
-                
-                conn.commit()
-                local_success = True
-                logging.info(f"로컬 DB: 주문 {order_id}의 출력 상태를 {is_printed}로 업데이트 성공")
+            sql = _update_order_sql(tuple(fields), len(order_ids))
+            with self.cache.transaction() as conn:
+                conn.execute(sql, (*fields.values(), *order_ids))
+            logging.info(f"로컬 DB: 주문 {order_ids} 업데이트 성공: {fields}")
                 
         except Exception as e:
             logging.error(f"로컬 DB 주문 상태 업데이트 오류: {e}")
             return False
         
-        # 2. Supabase 업데이트 (is_printed True/False 모든 경우)
-        if self.cache.base_url and local_success:
-            supabase_success = self._update_supabase_order_status(order_id, is_printed)
-        
-        # 3. 결과 처리
-        if local_success and supabase_success:
-            logging.info(f"주문 {order_id} 상태 업데이트 완전 성공 (로컬+Supabase)")
-            return True
-        elif local_success and not supabase_success:
-            logging.warning(f"주문 {order_id} 상태 업데이트 부분 성공 (로컬만 성공, Supabase 실패)")
-            # Supabase 실패해도 로컬은 성공했으므로 True 반환
-            return True
-        else:
-            logging.error(f"주문 {order_id} 상태 업데이트 실패")
-            return False
+        # 2. Supabase 업데이트 (백그라운드 전송)
+        # Supabase 실패해도 로컬은 성공했으므로 결과와 관계없이 True 반환
+        if self.cache.base_url:
+            self._http_pool.submit(self._patch_order_fields, list(order_ids), dict(fields))
+        return True
     
-    def _update_supabase_order_status(self, order_id: int, is_printed: bool, max_retries: int = 3) -> bool:
-        """Supabase의 주문 상태를 업데이트합니다 (재시도 로직 포함)."""
+    def _patch_order_fields(self, order_ids: List[int], fields: Dict[str, Any], max_retries: int = 3) -> bool:
+        """Supabase의 주문 컬럼을 업데이트합니다 (작업 스레드에서 실행, 재시도 로직 포함)."""
+        if len(order_ids) == 1:
+            order_filter = f"eq.{order_ids[0]}"
+        else:
+            order_filter = f"in.({','.join(str(order_id) for order_id in order_ids)})"
         
         for attempt in range(max_retries):
             try:
-                response = requests.patch(
+                response = self._http.patch(
                     f"{self.cache.base_url}/rest/v1/order",
-                    headers=self.cache.headers,
-                    json={
-                        "is_printed": is_printed,
-                        "last_print_attempt": datetime.now().isoformat()
-                    },
-                    params={"order_id": f"eq.{order_id}"},
+                    json=fields,
+                    params={"order_id": order_filter},
                     timeout=10  # 10초 타임아웃
                 )
                 response.raise_for_status()
                 
-                logging.info(f"Supabase: 주문 {order_id}의 is_printed를 {is_printed}로 업데이트 성공 (시도 {attempt + 1}/{max_retries})")
+                logging.info(f"Supabase: 주문 {order_ids} 업데이트 성공 (시도 {attempt + 1}/{max_retries})")
                 return True
                 
             except requests.exceptions.RequestException as e:
                 logging.warning(f"Supabase 업데이트 시도 {attempt + 1}/{max_retries} 실패: {e}")
                 if attempt == max_retries - 1:
-                    logging.error(f"Supabase 업데이트 최종 실패 (주문 {order_id}): {e}")
+                    logging.error(f"Supabase 업데이트 최종 실패 (주문 {order_ids}): {e}")
                     # Supabase에도 에러 로깅
                     error_logger = get_error_logger()
                     if error_logger:
                         error_logger.log_error(
                             e, 
                             f"Supabase 주문 상태 업데이트 실패", 
-                            {"order_id": order_id, "is_printed": is_printed, "attempts": max_retries}
+                            {"order_ids": order_ids, "fields": fields, "attempts": max_retries}
                         )
                 else:
                     # 재시도 전 잠시 대기
-                    import time
                     time.sleep(0.5 * (attempt + 1))  # 점진적 지연
             except Exception as e:
-                logging.error(f"Supabase 업데이트 예상치 못한 오류 (주문 {order_id}): {e}")
+                logging.error(f"Supabase 업데이트 예상치 못한 오류 (주문 {order_ids}): {e}")
                 break
         
         return False
@@ -378,35 +437,39 @@ class OrderWidget(QWidget):
         try:
             # 자동 출력이 비활성화된 경우 처리하지 않음
             auto_print_enabled = self.printer_manager.is_auto_print_enabled()
-            logging.debug(f"check_for_updates 호출됨 - 자동출력 활성화: {auto_print_enabled}")
+            logging.debug("check_for_updates 호출됨 - 자동출력 활성화: %s", auto_print_enabled)
             
             if not auto_print_enabled:
                 logging.debug("자동 출력이 비활성화되어 있어 처리하지 않음")
                 return
                 
-            # 주문 관련 테이블 동기화 (항상 수행)
-            for table in ["order", "order_item", "order_item_option"]:
-                self.cache.fetch_and_store_table(table)
+            # 주문 관련 테이블은 로컬에 없는 새 행만 동기화 (전체 동기화는 새로고침에서 수행)
+            self.cache.fetch_new_rows(_ORDER_TABLES, executor=self._sync_pool)
             
             # 미출력 주문들 가져오기
             unprinteed_orders = self.get_unprinteed_orders()
-            logging.info(f"미출력 주문 조회 결과: {len(unprinteed_orders)}개")
+            logging.debug("미출력 주문 조회 결과: %d개", len(unprinteed_orders))
             
             if unprinteed_orders:
-                logging.info(f"미출력 주문 {len(unprinteed_orders)}개를 확인했습니다.")
-                for order in unprinteed_orders:
-                    logging.info(f"미출력 주문 발견: ID={order.get('order_id')}, 회사={order.get('company_name')}")
+                logging.info("미출력 주문 %d개를 확인했습니다.", len(unprinteed_orders))
+                if logging.getLogger().isEnabledFor(logging.DEBUG):
+                    for order in unprinteed_orders:
+                        logging.debug("미출력 주문 발견: ID=%s, 회사=%s", order["order_id"], order["company_name"])
                 
                 # 임시 메시지가 표시 중이 아닐 때만 미출력 주문 메시지 표시
                 if not self.message_timer.isActive():
                     self.notice_label.setText(f"미출력 주문 {len(unprinteed_orders)}개 발견")
                 
-                # 각 미출력 주문에 대해 자동 출력 처리
+                # 각 미출력 주문에 대해 자동 출력 처리 (상태 저장은 루프 후 한 번에)
+                printed_ids = []
+                failed_ids = []
+                # 주문 상세는 한 번의 IN (...) 조회로 미리 가져옴
+                details = self.cache.join_order_details([order["order_id"] for order in unprinteed_orders])
                 for order in unprinteed_orders:
-                    order_detail = self.cache.join_order_detail(order["order_id"])
+                    order_detail = details.get(order["order_id"], {})
                     order_id = order_detail.get("order_id")
                     
-                    logging.info(f"주문 {order_id} 자동 출력 시도")
+                    logging.debug("주문 %s 자동 출력 시도", order_id)
                     
                     # 프린터 상태 확인
                     if not self.printer_manager.check_printer_status():
@@ -418,13 +481,20 @@ class OrderWidget(QWidget):
                     
                     if success:
                         logging.info(f"주문 {order_id} 자동 출력 성공")
-                        # 출력 성공 시 is_printed 상태 업데이트
-                        self.update_is_printed_status(order_id, True)
+                        printed_ids.append(order_id)
                     else:
                         logging.warning(f"주문 {order_id} 자동 출력 실패")
+                        if order_id is not None:
+                            failed_ids.append(order_id)
                 
-                # UI 새로고침
-                self.refresh_orders()
+                # 출력 결과와 마지막 출력 시도 시각을 성공/실패별로 한 번에 업데이트
+                attempted_at = datetime.now().isoformat()
+                self._update_order_fields(printed_ids, {"is_printed": True, "last_print_attempt": attempted_at})
+                self._update_order_fields(failed_ids, {"is_printed": False, "last_print_attempt": attempted_at})
+                
+                # 모든 미출력 주문이 이미 화면에 있으면 출력된 행만 갱신, 아니면 전체 새로고침
+                if not self._mark_rows_printed(printed_ids, [order["order_id"] for order in unprinteed_orders]):
+                    self.refresh_orders()
             else:
                 # 미출력 주문이 없으면 조용히 처리
                 pass
@@ -437,59 +507,45 @@ class OrderWidget(QWidget):
             if error_logger:
                 error_logger.log_error(e, "자동 출력 처리 오류", {"context": "auto_print_processing"})
 
-    def get_unprinteed_orders(self) -> List[Dict[str, Any]]:
-        """출력되지 않은 주문들을 가져옵니다."""
-        conn = sqlite3.connect(self.cache.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
-        
+    def _mark_rows_printed(self, printed_ids: List[int], required_ids: List[int]) -> bool:
+        """출력된 주문의 행만 출력완료로 갱신합니다. required_ids 중 화면에 없는 주문이 있으면 False."""
+        rows_by_id = {}
+        for row in range(self.order_table.rowCount()):
+            item = self.order_table.item(row, 1)
+            order_data = item.data(Qt.UserRole) if item else None
+            if order_data:
+                rows_by_id[order_data.get("order_id")] = (row, order_data)
+        if any(order_id not in rows_by_id for order_id in required_ids):
+            return False
+        # 여러 행을 바꾸는 동안 다시 그리기 중지 (한 번만 갱신)
+        self.order_table.setUpdatesEnabled(False)
+        try:
+            for order_id in printed_ids:
+                row, order_data = rows_by_id[order_id]
+                order_data["is_printed"] = True
+                self._fill_order_row(row, order_data)
+                if row < len(self._render_keys):
+                    self._render_keys[row] = self._order_render_key(order_data)
+        finally:
+            self.order_table.setUpdatesEnabled(True)
+        return True
+
+    def get_unprinteed_orders(self) -> List[sqlite3.Row]:
+        """출력되지 않은 주문들을 가져옵니다 (sqlite3.Row, 키로 접근)."""
         # is_printed가 0(False)인 주문들을 최신순으로 가져오기
-        query = """
-        SELECT o.order_id, o.company_id, o.is_dine_in, o.total_price, o.created_at,
-               c.company_name
-        FROM "order" o
-        JOIN company c ON c.company_id = o.company_id
-        WHERE o.is_printed = 0
-        ORDER BY o.created_at DESC
-        LIMIT 10
-        """
-        
-        rows = cursor.execute(query).fetchall()
-        conn.close()
-        return [dict(row) for row in rows]
+        with self.cache.connection() as conn:
+            return conn.execute(_SQL_UNPRINTED_ORDERS).fetchall()
 
     def update_is_printed_status(self, order_id: int, is_printed: bool) -> None:
         """주문의 출력 상태를 업데이트합니다."""
-        try:
-            # 로컬 DB 업데이트
-            with sqlite3.connect(self.cache.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    'UPDATE "order" SET is_printed = ? WHERE order_id = ?',
-                    (1 if is_printed else 0, order_id)
-                )
-                conn.commit()
-                logging.info(f"주문 {order_id}의 출력 상태를 {is_printed}로 업데이트")
-            
-            # Supabase에도 업데이트 시도
-            if self.cache.base_url:
-                try:
-                    response = requests.patch(
-                        f"{self.cache.base_url}/rest/v1/order",
-                        headers=self.cache.headers,
-                        json={"is_printed": is_printed},
-                        params={"order_id": f"eq.{order_id}"}
-                    )
-                    response.raise_for_status()
-                    logging.info(f"Supabase에 주문 {order_id} 출력 상태 업데이트 성공")
-                except Exception as e:
-                    logging.error(f"Supabase 출력 상태 업데이트 실패: {e}")
-                        
-        except Exception as e:
-            logging.error(f"출력 상태 업데이트 오류: {e}")
+        self.update_is_printed_statuses([order_id], is_printed)
+
+    def update_is_printed_statuses(self, order_ids: List[int], is_printed: bool) -> None:
+        """여러 주문의 출력 상태를 한 트랜잭션과 한 번의 Supabase 요청으로 업데이트합니다."""
+        self._update_order_fields(order_ids, {"is_printed": is_printed})
 
     def process_auto_print(self, order_data: dict) -> bool:
-        """자동 출력을 처리합니다."""
+        """자동 출력을 처리합니다. 출력 상태 저장은 호출한 쪽에서 모아서 처리합니다."""
         order_id = order_data.get("order_id")
         
         try:
@@ -526,7 +582,6 @@ class OrderWidget(QWidget):
             
             if customer_success and kitchen_success:
                 # 모든 프린터 출력 성공
-                self.update_order_status(order_id, True)
                 logging.info(f"주문 {order_id} 자동 출력 성공 (손님용+주방용)")
                 self.notice_label.setText(f"주문 {order_id}이(가) 자동으로 출력되었습니다 (손님용+주방용).")
                 return True
@@ -542,22 +597,15 @@ class OrderWidget(QWidget):
                 self.notice_label.setText(f"주문 {order_id} 일부 프린터만 출력됨: {', '.join(success_printers)}")
                 
                 # 손님용 프린터만 성공해도 주문을 완료로 처리
-                if customer_success:
-                    self.update_order_status(order_id, True)
-                    return True
-                else:
-                    self.update_order_status(order_id, False)
-                    return False
+                return customer_success
             else:
                 # 모든 프린터 출력 실패
-                self.update_order_status(order_id, False)
                 logging.error(f"주문 {order_id} 자동 출력 실패 (모든 프린터)")
                 self.notice_label.setText(f"주문 {order_id} 자동 출력 실패")
                 return False
                 
         except Exception as e:
             logging.error(f"자동 출력 처리 오류: {e}")
-            self.update_order_status(order_id, False)
             # Supabase에도 에러 로깅
             error_logger = get_error_logger()
             if error_logger:
@@ -592,19 +640,37 @@ class OrderWidget(QWidget):
             self.set_loading_state(True)
             
             # 주문 관련 테이블 동기화
-            for table in ["order", "order_item", "order_item_option"]:
-                self.cache.fetch_and_store_table(table)
+            self.cache.fetch_and_store_tables(_ORDER_TABLES, executor=self._sync_pool)
 
-            orders = self.cache.get_recent_orders()
+            # 최근 주문과 상세 정보를 한 번의 조인 쿼리로 조회
+            details = self.cache.get_recent_orders_with_details()
 
-            # 테이블 초기화
-            self.order_table.setRowCount(0)
-            self.orders = []
-
-            # 새로운 주문 데이터 추가 (최근 주문부터)
-            for order in orders:
-                detail = self.cache.join_order_detail(order["order_id"])
-                self.add_order(detail)
+            # 화면에 보이는 내용이 그대로면 테이블을 다시 만들지 않고 데이터만 교체
+            render_keys = [self._order_render_key(detail) for detail in details]
+            if render_keys == self._render_keys and self.order_table.rowCount() == len(details):
+                for row, detail in enumerate(details):
+                    item = self.order_table.item(row, 1)
+                    if item:
+                        item.setData(Qt.UserRole, detail)
+                self.orders = details
+            else:
+                # 행 갱신이 끝날 때까지 다시 그리기 중지 (한 번만 갱신)
+                self.order_table.setUpdatesEnabled(False)
+                try:
+                    # 주문 ID 기준으로 사라진 행은 지우고 새 주문 행만 끼워 넣음 (불가능하면 위치 기준 재사용)
+                    old_keys = self._align_rows([detail.get("order_id") for detail in details])
+                    self.order_table.setRowCount(len(details))
+                    for row, (detail, key) in enumerate(zip(details, render_keys)):
+                        if row < len(old_keys) and old_keys[row] == key:
+                            item = self.order_table.item(row, 1)
+                            if item:
+                                item.setData(Qt.UserRole, detail)
+                        else:
+                            self._fill_order_row(row, detail)
+                    self.orders = details
+                finally:
+                    self.order_table.setUpdatesEnabled(True)
+                self._render_keys = render_keys
 
             # 임시 메시지가 표시 중이 아닐 때만 갱신 메시지 표시
             if not self.message_timer.isActive():
@@ -619,6 +685,44 @@ class OrderWidget(QWidget):
         finally:
             self.set_loading_state(False)
     
+    def _align_rows(self, new_ids):
+        """현재 행들을 새 주문 ID 순서에 맞춰 삽입/삭제하고, 행별 이전 키 목록을 반환합니다.
+
+        남은 주문의 순서가 바뀐 경우에는 행을 옮기지 않고 기존 키 목록을 그대로 반환합니다.
+        """
+        old_keys = list(self._render_keys)
+        if len(old_keys) != self.order_table.rowCount():
+            return old_keys
+        new_id_set = set(new_ids)
+        kept_ids = [key[0] for key in old_keys if key[0] in new_id_set]
+        # 남은 주문이 새 목록에서도 같은 순서인지 확인
+        remaining = iter(new_ids)
+        if not all(order_id in remaining for order_id in kept_ids):
+            return old_keys
+        for row in reversed(range(len(old_keys))):
+            if old_keys[row][0] not in new_id_set:
+                self.order_table.removeRow(row)
+                del old_keys[row]
+        for row, order_id in enumerate(new_ids):
+            if row >= len(old_keys) or old_keys[row][0] != order_id:
+                self.order_table.insertRow(row)
+                old_keys.insert(row, None)
+        return old_keys
+
+    @staticmethod
+    def _order_render_key(order_data):
+        """테이블 행에 표시되는 값들로 만든 비교용 키"""
+        items = order_data.get("items", [])
+        return (
+            order_data.get("order_id"),
+            order_data.get("company_name"),
+            order_data.get("is_dine_in", True),
+            order_data.get("total_price", 0),
+            order_data.get("is_printed", False),
+            order_data.get("created_at", ""),
+            tuple((item.get("name"), item.get("quantity", 1)) for item in items),
+        )
+
     def get_selected_order_data(self):
         """선택된 주문 데이터를 가져와서 포맷팅합니다."""
         selected_items = self.order_table.selectedItems()
@@ -775,74 +879,83 @@ class OrderWidget(QWidget):
         try:
             row_position = self.order_table.rowCount()
             self.order_table.insertRow(row_position)
+            self._fill_order_row(row_position, order_data)
+            self.orders.append(order_data)
+        except Exception as e:
+            QMessageBox.warning(self, "오류", f"주문 추가 중 오류가 발생했습니다: {str(e)}")
+
+    def _set_cell_text(self, row, column, text):
+        """셀 아이템이 있으면 텍스트만 바꾸고 없으면 새로 만듭니다."""
+        item = self.order_table.item(row, column)
+        if item is None:
+            item = QTableWidgetItem(text)
+            self.order_table.setItem(row, column, item)
+        else:
+            item.setText(text)
+        return item
 
-            # 체크박스 추가
+    def _fill_order_row(self, row_position, order_data):
+        """행에 주문 내용을 채웁니다 (기존 셀 위젯이 있으면 재사용)."""
+        is_printed = order_data.get("is_printed", False)
+
+        # 체크박스 (재사용 시 값 변경 이벤트가 나가지 않도록 신호 차단)
+        check_box = self.order_table.cellWidget(row_position, 0)
+        if check_box is None:
             check_box = QCheckBox()
-            check_box.setChecked(order_data.get("is_printed", False)) # 초기 상태 설정
-            check_box.stateChanged.connect(lambda state, r=row_position: self.on_checkbox_changed(r, state))
+            check_box.setChecked(is_printed) # 초기 상태 설정
+            check_box.stateChanged.connect(self._on_row_checkbox_changed)
             self.order_table.setCellWidget(row_position, 0, check_box)
+        else:
+            check_box.blockSignals(True)
+            check_box.setChecked(is_printed)
+            check_box.blockSignals(False)
 
-            # 주문 데이터 설정
-            order_id = str(order_data.get("order_id", "N/A"))
-            item_id = QTableWidgetItem(order_id)
-            item_id.setData(Qt.UserRole, order_data)
-            self.order_table.setItem(row_position, 1, item_id)
-            
-            # 회사명
-            company_name = order_data.get("company_name", "N/A")
-            self.order_table.setItem(row_position, 2, QTableWidgetItem(company_name))
-            
-            # 메뉴 항목 구성
-            items = order_data.get("items", [])
-            items_text = "\n".join([
-                f"{item.get('name', 'N/A')} x{item.get('quantity', 1)}"
-                for item in items
-            ])
-            self.order_table.setItem(row_position, 3, QTableWidgetItem(items_text))
-            
-            # 매장식사 여부
-            is_dine_in = "매장식사" if order_data.get("is_dine_in", True) else "포장"
-            self.order_table.setItem(row_position, 4, QTableWidgetItem(is_dine_in))
-            
-            # 총액
-            total_price = f"{order_data.get('total_price', 0):,}원"
-            self.order_table.setItem(row_position, 5, QTableWidgetItem(total_price))
-            
-            # 상태 (기존 is_printed 기반) - 드롭다운으로 변경
-            status = "출력완료" if order_data.get("is_printed", False) else "신규"
-            
-            # QComboBox 생성
+        # 주문 데이터 설정
+        item_id = self._set_cell_text(row_position, 1, str(order_data.get("order_id", "N/A")))
+        item_id.setData(Qt.UserRole, order_data)
+        
+        # 회사명
+        self._set_cell_text(row_position, 2, order_data.get("company_name", "N/A"))
+        
+        # 메뉴 항목 구성
+        items = order_data.get("items", [])
+        items_text = "\n".join([
+            f"{item.get('name', 'N/A')} x{item.get('quantity', 1)}"
+            for item in items
+        ])
+        self._set_cell_text(row_position, 3, items_text)
+        
+        # 매장식사 여부
+        is_dine_in = "매장식사" if order_data.get("is_dine_in", True) else "포장"
+        self._set_cell_text(row_position, 4, is_dine_in)
+        
+        # 총액
+        self._set_cell_text(row_position, 5, _format_price(order_data.get('total_price', 0)))
+        
+        # 상태 (기존 is_printed 기반) - 드롭다운
+        status = "출력완료" if is_printed else "신규"
+        status_combo = self.order_table.cellWidget(row_position, 6)
+        if status_combo is None:
             status_combo = QComboBox()
             status_combo.addItems(["신규", "출력완료"])
             status_combo.setCurrentText(status)
             
             # 상태 변경 이벤트 연결
-            status_combo.currentTextChanged.connect(
-                lambda new_status, row=row_position: self.on_status_changed(row, new_status)
-            )
+            status_combo.currentTextChanged.connect(self._on_row_status_changed)
             
             # 테이블에 QComboBox 위젯 설정
             self.order_table.setCellWidget(row_position, 6, status_combo)
-            
-            # 주문일시
-            created_at = order_data.get("created_at", "")
-            if created_at:
-                # ISO 형식의 날짜를 한국 시간(KST)으로 변환하여 표시
-                from datetime import datetime, timezone
-                from zoneinfo import ZoneInfo
-                try:
-                    dt = datetime.fromisoformat(created_at.replace('Z', '+00:00'))
-                    if dt.tzinfo is None:
-                        dt = dt.replace(tzinfo=timezone.utc)
-                    dt = dt.astimezone(ZoneInfo("Asia/Seoul"))
-                    created_at = dt.strftime("%Y-%m-%d %H:%M:%S")
-                except Exception:
-                    pass
-            self.order_table.setItem(row_position, 7, QTableWidgetItem(created_at))
-            
-            self.orders.append(order_data)
-        except Exception as e:
-            QMessageBox.warning(self, "오류", f"주문 추가 중 오류가 발생했습니다: {str(e)}")
+        else:
+            status_combo.blockSignals(True)
+            status_combo.setCurrentText(status)
+            status_combo.blockSignals(False)
+        
+        # 주문일시
+        created_at = order_data.get("created_at", "")
+        if created_at:
+            # ISO 형식의 날짜를 한국 시간(KST)으로 변환하여 표시
+            created_at = _format_created_at(created_at)
+        self._set_cell_text(row_position, 7, created_at)
 
     @Slot()
     def sync_static_tables(self):
@@ -860,14 +973,24 @@ class OrderWidget(QWidget):
             self.set_loading_state(True)
             
             changes = []
+            old_counts = self.cache.count_table_rows(tables)
             for table in tables:
-                old_data = self.cache.get_table_data(table)
+                revision = self.cache.table_revision(table)
+                # 이번 실행에서 처음 받는 테이블만 기존 내용과 직접 비교 (이후에는 재작성 여부로 판단)
+                old_data = self.cache.get_table_data(table) if revision == 0 else None
                 self.cache.fetch_and_store_table(table)
-                new_data = self.cache.get_table_data(table)
                 
-                # 변경사항 확인
-                if old_data != new_data:
-                    changes.append(f"{table}: {len(new_data) - len(old_data)}개 항목 변경")
+                # 변경사항 확인 (테이블을 다시 쓰지 않았으면 변경 없음)
+                if self.cache.table_revision(table) == revision:
+                    continue
+                if old_data is not None:
+                    new_data = self.cache.get_table_data(table)
+                    if old_data == new_data:
+                        continue
+                    new_count = len(new_data)
+                else:
+                    new_count = self.cache.count_table_rows([table])[table]
+                changes.append(f"{table}: {new_count - old_counts[table]}개 항목 변경")
             
             if changes:
                 QMessageBox.information(
@@ -883,6 +1006,17 @@ class OrderWidget(QWidget):
         finally:
             self.set_loading_state(False)
 
+    def _sender_row(self):
+        """신호를 보낸 셀 위젯이 현재 놓인 행 (행이 삽입/삭제되어도 정확함)"""
+        widget = self.sender()
+        return self.order_table.indexAt(widget.pos()).row() if widget else -1
+
+    def _on_row_checkbox_changed(self, state):
+        self.on_checkbox_changed(self._sender_row(), state)
+
+    def _on_row_status_changed(self, new_status):
+        self.on_status_changed(self._sender_row(), new_status)
+
     def on_checkbox_changed(self, row, state):
         """체크박스 상태가 변경될 때 호출되는 메서드"""
         try:
@@ -1035,6 +1169,8 @@ class OrderWidget(QWidget):
             # 성공한 주문들의 행을 역순으로 삭제 (인덱스 변경 방지)
             for row, order_id in sorted(successful_cancellations, reverse=True):
                 self.order_table.removeRow(row)
+                if row < len(self._render_keys):
+                    del self._render_keys[row]
                 # orders 리스트에서도 제거
                 self.orders = [order for order in self.orders if order.get("order_id") != order_id]
                 logging.info(f"주문 {order_id} 취소 성공")
@@ -1064,11 +1200,20 @@ class OrderWidget(QWidget):
 
     def closeEvent(self, event):
         """위젯이 닫힐 때 모니터링 시스템 중지"""
+        # 적용 대기 중인 자동 출력 변경이 있으면 바로 저장
+        if self._auto_print_timer.isActive():
+            self._auto_print_timer.stop()
+            self._apply_auto_print()
         try:
             if self.order_monitor:
                 self.order_monitor.stop_monitoring()
         except Exception as e:
             logging.error(f"모니터링 시스템 종료 오류: {e}")
+        # 전송 중인 상태 PATCH는 마저 보내고 종료
+        self._sync_pool.shutdown(wait=False, cancel_futures=True)
+        self._http_pool.shutdown(wait=True)
+        self._http.close()
+        self.cache.close()
         super().closeEvent(event)
 
     def on_status_changed(self, row, new_status):
@@ -6,10 +6,21 @@ from typing import Optional
 
 logger = logging.getLogger(__name__)
 
+# 미리보기 대상 파일 (gui 폴더 기준 printer/output 폴더)
+RECEIPT_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "printer", "output", "test_receipt_output.bin"
+)
+
+# 미리보기로 읽을 최대 바이트 수 (파일 끝부분 기준)
+MAX_PREVIEW_BYTES = 65536
+
+# 제거할 제어문자: 0x00~0x1F (줄바꿈 제외), 0x7F(DEL)
+_CONTROL_BYTES = bytes(b for b in range(0x20) if b not in (0x0a, 0x0d)) + b"\x7f"
+
 
 def clean_escpos_bytes(data: bytes) -> bytes:
     # 0x00~0x1F (제어문자), 0x7F(DEL) 제거
-    return bytes([b for b in data if b >= 0x20 or b in (0x0a, 0x0d)])
+    return data.translate(None, _CONTROL_BYTES)
 
 def try_decodings(data: bytes):
     for enc in ['cp949', 'euc-kr', 'utf-8']:
@@ -19,19 +30,38 @@ def try_decodings(data: bytes):
             continue
     return data.decode('latin1', errors='replace')
 
-def read_receipt_file() -> Optional[str]:
-    """`test_print_output.bin` 파일을 읽어 영수증 텍스트를 반환한다."""
+def receipt_file_stamp() -> Optional[tuple]:
+    """영수증 파일의 (수정 시각, 크기). 파일이 없으면 None."""
+    try:
+        st = os.stat(RECEIPT_PATH)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+def read_receipt_file(max_bytes: Optional[int] = MAX_PREVIEW_BYTES) -> Optional[str]:
+    """`test_print_output.bin` 파일을 읽어 영수증 텍스트를 반환한다.
+
+    파일이 ``max_bytes``보다 크면 끝부분만 읽는다 (``None``이면 전체).
+    """
     try:
-        # gui 폴더에서 printer/output 폴더로의 상대 경로 수정
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        path = os.path.join(current_dir, "..", "printer", "output", "test_receipt_output.bin")
+        path = RECEIPT_PATH
 
         if not os.path.exists(path):
             return "영수증 파일이 없습니다."
 
         # 바이너리 모드로 읽기 (encoding, errors 옵션 X)
         with open(path, "rb") as f:
-            content = f.read()
+            size = f.seek(0, os.SEEK_END)
+            if max_bytes is not None and size > max_bytes:
+                f.seek(size - max_bytes)
+                content = f.read()
+                # 멀티바이트 문자 중간에서 시작하지 않도록 첫 줄바꿈 이후부터 사용
+                newline = content.find(b"\n")
+                if newline != -1:
+                    content = content[newline + 1:]
+            else:
+                f.seek(0)
+                content = f.read()
 
         cleaned = clean_escpos_bytes(content)
         decoded = try_decodings(cleaned)
@@ -1,5 +1,6 @@
 import json
 import logging
+import os
 from pathlib import Path
 from typing import List
 import win32print
@@ -164,8 +165,11 @@ class PrinterManager:
                 "auto_print": self._auto_print_config.copy()
             }
             
-            with open(self.config_file, "w", encoding="utf-8") as f:
+            # 임시 파일에 쓴 뒤 교체 (저장 중 종료되어도 기존 설정 파일 유지)
+            tmp_path = self.config_file.with_name(self.config_file.name + ".tmp")
+            with open(tmp_path, "w", encoding="utf-8") as f:
                 json.dump(config, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.config_file)
             
             logger.info("설정 저장 완료")
             return True
@@ -269,6 +273,9 @@ class PrinterManager:
 
     def set_auto_print_config(self, config: dict) -> bool:
         """자동 출력 설정을 업데이트합니다."""
+        # 메모리 설정과 같으면 파일을 다시 쓰지 않음
+        if all(self._auto_print_config.get(key) == value for key, value in config.items()):
+            return True
         logger.info(f"자동 출력 설정 업데이트: {config}")
         self._auto_print_config.update(config)
         return self.save_config()
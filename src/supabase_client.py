@@ -20,6 +20,8 @@ class SupabaseClient(QObject):
             "apikey": self.api_key,
             "Authorization": f"Bearer {self.api_key}",
         }
+        # 요청마다 TCP/TLS 연결을 새로 맺지 않도록 keep-alive 세션 재사용
+        self.session = requests.Session()
 
     def get_orders(self, limit: int = 10) -> List[Dict[str, Any]]:
         """최근 주문 목록을 가져옵니다."""
@@ -50,7 +52,7 @@ class SupabaseClient(QObject):
                 "order": "created_at.desc",
                 "limit": str(limit),
             }
-            resp = requests.get(f"{self.base_url}/rest/v1/order", headers=self.headers, params=params)
+            resp = self.session.get(f"{self.base_url}/rest/v1/order", headers=self.headers, params=params)
             resp.raise_for_status()
             orders = resp.json()
             
@@ -123,7 +125,7 @@ class SupabaseClient(QObject):
                 "select": "*",
                 "order_id": f"eq.{order_id}",
             }
-            resp = requests.get(f"{self.base_url}/rest/v1/order", headers=self.headers, params=params)
+            resp = self.session.get(f"{self.base_url}/rest/v1/order", headers=self.headers, params=params)
             resp.raise_for_status()
             data = resp.json()
             return data[0] if data else None
@@ -143,7 +145,7 @@ class SupabaseClient(QObject):
         """특정 주문을 삭제합니다."""
         try:
             # 1단계: 해당 주문의 order_item_id들을 먼저 조회
-            resp = requests.get(
+            resp = self.session.get(
                 f"{self.base_url}/rest/v1/order_item",
                 headers=self.headers,
                 params={
@@ -159,7 +161,7 @@ class SupabaseClient(QObject):
                 # 2단계: 조회된 order_item_id들로 order_item_option 삭제
                 if order_item_ids:
                     order_item_ids_str = ",".join(order_item_ids)
-                    resp = requests.delete(
+                    resp = self.session.delete(
                         f"{self.base_url}/rest/v1/order_item_option",
                         headers=self.headers,
                         params={"order_item_id": f"in.({order_item_ids_str})"}
@@ -170,7 +172,7 @@ class SupabaseClient(QObject):
                 logger.warning(f"주문 항목 조회 실패: {resp.status_code} - {resp.text}")
             
             # 3단계: 주문 항목 삭제
-            resp = requests.delete(
+            resp = self.session.delete(
                 f"{self.base_url}/rest/v1/order_item",
                 headers=self.headers,
                 params={"order_id": f"eq.{order_id}"}
@@ -179,7 +181,7 @@ class SupabaseClient(QObject):
                 logger.warning(f"주문 항목 삭제 응답: {resp.status_code} - {resp.text}")
             
             # 4단계: 주문 삭제
-            resp = requests.delete(
+            resp = self.session.delete(
                 f"{self.base_url}/rest/v1/order",
                 headers=self.headers,
                 params={"order_id": f"eq.{order_id}"}
@@ -4,24 +4,33 @@ import requests
 import zipfile
 import shutil
 import logging
+import functools
 from pathlib import Path
 from typing import Optional, Dict, Any
 import sys
 from datetime import datetime
 
+# 마지막 릴리즈 조회 응답의 ETag (조건부 요청용)
+_last_release_etag: Optional[str] = None
+
 class AutoUpdater:
-    def __init__(self, github_repo: str, current_version: str):
+    def __init__(self, github_repo: str, current_version: str,
+                 session: Optional[requests.Session] = None, etag: Optional[str] = None):
         """
         GitHub 자동 업데이트 시스템
         
         Args:
             github_repo: GitHub 저장소 (예: "username/repository")
             current_version: 현재 프로그램 버전
+            session: 재사용할 HTTP 세션 (없으면 요청마다 새 연결)
+            etag: 이전 릴리즈 조회 응답의 ETag (If-None-Match 조건부 요청에 사용)
         """
         self.github_repo = github_repo
         self.current_version = current_version
         self.api_url = f"https://api.github.com/repos/{github_repo}"
         self.latest_version: Optional[str] = None
+        self.session = session or requests
+        self.etag = etag
         
         # 업데이트 로거 설정
         self.logger = logging.getLogger("updater")
@@ -39,7 +48,16 @@ class AutoUpdater:
         """
         try:
             self.logger.info("업데이트 확인 중...")
-            response = requests.get(f"{self.api_url}/releases/latest", timeout=10)
+            headers = {"Accept-Encoding": "gzip"}
+            if self.etag:
+                headers["If-None-Match"] = self.etag
+            response = self.session.get(f"{self.api_url}/releases/latest", headers=headers, timeout=10)
+            
+            # 마지막 확인 이후 최신 릴리즈가 바뀌지 않음
+            if response.status_code == 304:
+                self.logger.info("최신 릴리즈가 변경되지 않았습니다.")
+                return None
+            
             response.raise_for_status()
             
             latest_release = response.json()
@@ -51,9 +69,12 @@ class AutoUpdater:
             if self._is_newer_version(latest_version, self.current_version):
                 self.logger.info("새로운 업데이트가 있습니다.")
                 self.latest_version = latest_version
+                # 새 버전이 설치되기 전에는 ETag를 갱신하지 않음
+                # (사용자가 업데이트를 미뤄도 다음 확인에서 304로 숨겨지지 않도록)
                 return latest_release
             else:
                 self.logger.info("최신 버전을 사용 중입니다.")
+                self.etag = response.headers.get("ETag", self.etag)
                 return None
                 
         except requests.RequestException as e:
@@ -117,7 +138,7 @@ class AutoUpdater:
             temp_dir.mkdir(exist_ok=True)
             download_path = temp_dir / filename
             
-            response = requests.get(download_url, stream=True, timeout=30)
+            response = self.session.get(download_url, stream=True, timeout=30)
             response.raise_for_status()
             
             with open(download_path, 'wb') as f:
@@ -362,12 +383,14 @@ echo 임시 파일을 정리합니다...
                 json.dump(version_info, f, indent=4, ensure_ascii=False)
                 
             self.logger.info(f"버전 정보가 {self.latest_version}로 업데이트되었습니다.")
+            get_current_version.cache_clear()
                 
         except Exception as e:
             self.logger.warning(f"버전 정보 업데이트 실패: {e}")
 
+@functools.lru_cache(maxsize=1)
 def get_current_version() -> str:
-    """현재 프로그램 버전 가져오기"""
+    """현재 프로그램 버전 가져오기 (version.json이 갱신되면 cache_clear() 호출)"""
     try:
         # PyInstaller로 빌드되었을 때와 일반 실행 환경 모두 지원
         if getattr(sys, 'frozen', False):
@@ -389,22 +412,31 @@ def get_current_version() -> str:
     
     return "1.0.0"
 
-def check_and_update(github_repo: str, auto_apply: bool = False) -> bool:
+def get_last_release_etag() -> Optional[str]:
+    """마지막 check_and_update 호출에서 받은 릴리즈 ETag 반환"""
+    return _last_release_etag
+
+def check_and_update(github_repo: str, auto_apply: bool = False,
+                     session: Optional[requests.Session] = None, etag: Optional[str] = None) -> bool:
     """
     업데이트 확인 및 적용
     
     Args:
         github_repo: GitHub 저장소
         auto_apply: 자동 적용 여부
+        session: 재사용할 HTTP 세션
+        etag: 이전 릴리즈 조회 응답의 ETag
         
     Returns:
         업데이트 적용 여부
     """
+    global _last_release_etag
     current_version = get_current_version()
-    updater = AutoUpdater(github_repo, current_version)
+    updater = AutoUpdater(github_repo, current_version, session=session, etag=etag)
     
     # 업데이트 확인
     release_info = updater.check_for_updates()
+    _last_release_etag = updater.etag
     if not release_info:
         return False
     